@@ -0,0 +1,72 @@
+"""
+Rollout throughput: copy-per-step SGS-I rollouts vs. in-place do/undo rollouts.
+
+    python -m bench.rollout [instance.json ...]
+"""
+from __future__ import annotations
+
+import os
+import sys
+import time
+
+from utils.load_instance import load_instance
+from sgs.sgs_ops import build_initial_state
+from mcts.refs import compute_refs
+from mcts.core import MCTS
+
+
+CFG = {
+    "inst_files": [
+        "./instances/2_100_0.json",
+        "./instances/3_50_0.json",
+    ],
+    "n_rollouts": 200,
+    "n_start_states": 8,  # distinct start states, cycled so the scratch has to resync
+}
+
+
+def start_states(mcts: MCTS, root, n: int):
+    states = [root]
+    for action in mcts.legal_actions(root)[: n - 1]:
+        states.append(mcts.step(root, action)[0])
+    return states
+
+
+def rollouts_per_sec(mcts: MCTS, states, n_rollouts: int):
+    rewards = []
+    t0 = time.perf_counter()
+    for i in range(n_rollouts):
+        rewards.append(mcts._simulate_sgs_i(states[i % len(states)]))
+    return n_rollouts / (time.perf_counter() - t0), rewards
+
+
+def bench_one(inst_file: str) -> None:
+    inst = load_instance(inst_file, apply_rules=True)
+    refs = compute_refs(inst)
+    root = build_initial_state(inst)
+
+    copy_mcts = MCTS(inst, refs, inplace_rollout=False)
+    inplace_mcts = MCTS(inst, refs, inplace_rollout=True)
+    states = start_states(copy_mcts, root, CFG["n_start_states"])
+
+    before, r_before = rollouts_per_sec(copy_mcts, states, CFG["n_rollouts"])
+    after, r_after = rollouts_per_sec(inplace_mcts, states, CFG["n_rollouts"])
+    assert r_before == r_after, "in-place rollout reward differs from copy rollout"
+
+    print(
+        f"[{os.path.basename(inst_file)}] tasks={len(inst['T'])} "
+        f"copy={before:.1f}/s inplace={after:.1f}/s speedup={after / before:.2f}x"
+    )
+
+
+def main():
+    files = sys.argv[1:] or CFG["inst_files"]
+    for f in files:
+        if not os.path.exists(f):
+            print(f"[MISSING] {f}")
+            continue
+        bench_one(f)
+
+
+if __name__ == "__main__":
+    main()
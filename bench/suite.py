@@ -0,0 +1,155 @@
+"""
+Benchmark suite: load_instance (with / without rules), sgs_a, sgs_i,
+compute_refs and MCTS.search over a grid of instance sizes. Each case reports
+min / median / p10 / p90 wall time over CFG["repeat"] runs, peak traced memory
+of one extra run, and rollouts/sec for MCTS. Results go to a JSON file so runs
+from different commits can be compared.
+
+    python -m bench.suite [out.json]
+"""
+from __future__ import annotations
+
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from utils.load_instance import load_instance
+from sgs.sgs_a import sgs_a
+from sgs.sgs_i import sgs_i
+from sgs.sgs_ops import build_initial_state
+from mcts.refs import compute_refs
+from mcts.core import MCTS
+
+
+CFG = {
+    "inst_dir": "./instances",
+    "n_cranes_list": [2, 3],
+    "n_jobs_list": [5, 10, 20, 50, 100, 200],
+    "idx_list": range(3),
+
+    "repeat": 5,
+    "mcts_iters": 100,  # iterations of one MCTS.search from the empty schedule
+    "seed": 0,
+
+    "out_json": "bench_results.json",
+}
+
+
+def percentile(xs, q: float) -> float:
+    return float(np.percentile(xs, q))
+
+
+def measure(fn, repeat: int):
+    """Wall times of repeat calls, then peak traced memory (KiB) of one more call."""
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "runs": repeat,
+        "min": min(times),
+        "median": statistics.median(times),
+        "p10": percentile(times, 10),
+        "p90": percentile(times, 90),
+        "peak_kib": peak / 1024,
+    }
+
+
+def mcts_search(inst, refs, n_iter: int, seed: int):
+    mcts = MCTS(inst, refs, seed=seed)
+    mcts.search(build_initial_state(inst), n_iter=n_iter)
+    return mcts.stats()
+
+
+def quiet_load(f: str, apply_rules: bool):
+    # load_instance prints one line per call
+    with open(os.devnull, "w") as devnull:
+        stdout, sys.stdout = sys.stdout, devnull
+        try:
+            return load_instance(f, apply_rules=apply_rules, cache=False)
+        finally:
+            sys.stdout = stdout
+
+
+def bench_instance(f: str) -> list:
+    repeat, seed, n_iter = CFG["repeat"], CFG["seed"], CFG["mcts_iters"]
+    inst = quiet_load(f, apply_rules=True)
+    refs = compute_refs(inst, seed=seed)
+
+    cases = {
+        "load_instance": lambda: quiet_load(f, apply_rules=True),
+        "load_instance_no_rules": lambda: quiet_load(f, apply_rules=False),
+        "sgs_a": lambda: sgs_a(inst),
+        "sgs_i": lambda: sgs_i(inst),
+        "compute_refs": lambda: compute_refs(inst, seed=seed),
+        "mcts_search": lambda: mcts_search(inst, refs, n_iter, seed),
+    }
+
+    rows = []
+    for case, fn in cases.items():
+        row = {"file": os.path.basename(f), "n_tasks": len(inst["T"]), "case": case}
+        row.update(measure(fn, repeat))
+        if case == "mcts_search":
+            stats = mcts_search(inst, refs, n_iter, seed)
+            row["iterations"] = n_iter
+            row["rollouts_per_sec"] = stats["rollouts_per_sec"]
+            row["iters_per_sec"] = n_iter / row["median"]
+        rows.append(row)
+        print(f"[{row['file']}] {case:<24} median={row['median'] * 1e3:9.2f}ms "
+              f"p90={row['p90'] * 1e3:9.2f}ms peak={row['peak_kib']:10.1f}KiB")
+    return rows
+
+
+def git_commit() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True)
+    except OSError:
+        return None
+    return out.stdout.strip() or None
+
+
+def main():
+    out_json = sys.argv[1] if len(sys.argv) > 1 else CFG["out_json"]
+
+    results = []
+    for ncr in CFG["n_cranes_list"]:
+        for nj in CFG["n_jobs_list"]:
+            for idx in CFG["idx_list"]:
+                f = os.path.join(CFG["inst_dir"], f"{ncr}_{nj}_{idx}.json")
+                if not os.path.exists(f):
+                    print(f"[MISSING] {f}")
+                    continue
+                for row in bench_instance(f):
+                    results.append(dict(row, n_cranes=ncr, n_jobs=nj, idx=idx))
+
+    meta = {
+        "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "cfg": dict(CFG, idx_list=list(CFG["idx_list"])),
+    }
+    with open(out_json, "w") as fp:
+        json.dump({"meta": meta, "results": results}, fp, indent=1)
+    print(f"[SAVED] {out_json} ({len(results)} rows)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Start-window search, timed over every (ready task, crane) pair of random
+partial schedules so most calls see several placed conflicts:
+  split    - every conflict splits every window, no merging (original)
+  scan     - cut_window() over the full conflict list of (t, v)
+  timeline - window_start(): cut_window() over the conflicts bisected out of
+             the per-crane start-time timelines
+
+    python -m bench.windows [instance.json ...]
+"""
+from __future__ import annotations
+
+import os
+import random
+import sys
+import time
+
+from utils.load_instance import load_instance
+from sgs.sgs_ops import (
+    build_initial_state, ready_tasks, compute_est, apply_action_inplace, cut_window, window_start,
+)
+
+
+CFG = {
+    "inst_files": [
+        "./instances/3_50_0.json",
+        "./instances/3_50_1.json",
+        "./instances/3_50_2.json",
+    ],
+    "n_states": 200,  # random partial schedules
+    "repeat": 5,
+    "seed": 0,
+}
+
+
+def window_start_split(est, ls, conflicts, S, G, h, t):
+    # previous implementation: every conflict splits every window in two, no merging
+    R = []
+    if est <= ls:
+        R.append((est, ls))
+        for t2, v2, d_in, d_out in conflicts:
+            if t2 not in G[v2]:
+                continue
+            Rprime = []
+            for (es_t, ls_t) in R:
+                new_ls = min(ls_t, S[t2] - d_out - h[t])
+                if es_t <= new_ls:
+                    Rprime.append((es_t, new_ls))
+                new_es = max(es_t, S[t2] + h[t2] + d_in)
+                if new_es <= ls_t:
+                    Rprime.append((new_es, ls_t))
+            R = Rprime
+    return min(R, key=lambda x:x[0])[0] if R else None
+
+
+def window_start_scan(est, ls, conflicts, S, G, h, t):
+    if est > ls:
+        return None
+    R = [(est, ls)]
+    for t2, v2, d_in, d_out in conflicts:
+        if t2 not in G[v2]:
+            continue
+        R = cut_window(R, S[t2] - d_out - h[t], S[t2] + h[t2] + d_in)
+        if not R:
+            return None
+    return R[0][0]
+
+
+def sample_calls(inst, n_states: int, rng: random.Random):
+    """(est, ls, t, v, st) for each ready (t, v) of n_states random partial schedules."""
+    l1, that, ls = inst["l^1"], inst["hat(t)"], inst["ls"]
+    calls = []
+    for _ in range(n_states):
+        st = build_initial_state(inst)
+        for _ in range(rng.randrange(len(inst["T"]))):
+            t = rng.choice(ready_tasks(st))
+            v = rng.choice(inst["V_tau"][t])
+            apply_action_inplace(inst, st, t, v, compute_est(inst, st, t, v))
+        for t in ready_tasks(st):
+            for v in inst["V_tau"][t]:
+                est = max(st.ES[t], st.C[v] + abs(l1[t] - st.L[v]) * that)
+                calls.append((est, ls[t], t, v, st))
+    return calls
+
+
+def time_calls(fn, args, repeat: int):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        out = [fn(*a) for a in args]
+    return (time.perf_counter() - t0) / (repeat * len(args)), out
+
+
+def bench_one(inst_file: str) -> None:
+    inst = load_instance(inst_file, apply_rules=True)
+    calls = sample_calls(inst, CFG["n_states"], random.Random(CFG["seed"]))
+    h, conflicts, by_crane = inst["h"], inst["conflicts"], inst["conflicts_by_crane"]
+    scan_args = [(est, ls, conflicts[t, v], st.S, st.G, h, t) for est, ls, t, v, st in calls]
+    timeline_args = [(est, ls, by_crane[t, v], st.TL, h, t) for est, ls, t, v, st in calls]
+
+    split, r_split = time_calls(window_start_split, scan_args, CFG["repeat"])
+    scan, r_scan = time_calls(window_start_scan, scan_args, CFG["repeat"])
+    timeline, r_timeline = time_calls(window_start, timeline_args, CFG["repeat"])
+    assert r_split == r_scan == r_timeline, "window starts differ"
+
+    print(
+        f"[{os.path.basename(inst_file)}] calls={len(calls)} split={split * 1e6:.2f}us "
+        f"scan={scan * 1e6:.2f}us timeline={timeline * 1e6:.2f}us speedup={split / timeline:.2f}x"
+    )
+
+
+def main():
+    files = sys.argv[1:] or CFG["inst_files"]
+    for f in files:
+        if not os.path.exists(f):
+            print(f"[MISSING] {f}")
+            continue
+        bench_one(f)
+
+
+if __name__ == "__main__":
+    main()
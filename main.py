@@ -1,12 +1,13 @@
 import time
-from tqdm import tqdm
-from utils import load_instance
-from init_heuristics import sgs_a
+from utils.load_instance import load_instance
+from sgs.sgs_a import sgs_a
+from sgs.sgs_i import sgs_i
+from sgs.multistart import multistart
 
 
 
 
-def main(n_cranes, n_jobs, instance_idx, n_sampling=1):
+def main(n_cranes, n_jobs, instance_idx, n_sampling=1, heuristic="sgs_a", n_workers=1, seed=0):
     # 인스턴스 경로 생성
     inst_path = f"./instances/{n_cranes}_{n_jobs}_{instance_idx}.json"
     # 로딩
@@ -15,24 +16,25 @@ def main(n_cranes, n_jobs, instance_idx, n_sampling=1):
     load_time = time.time() - start
     print(f"[INFO] Instance loaded in {load_time:.4f} sec")
 
-    results = []
-    for _ in tqdm(range(n_sampling)):
-    # for _ in range(n_sampling):
-        # 휴리스틱 실행
+    # n_sampling == 1: 결정적(deterministic) 휴리스틱 한 번
+    if n_sampling <= 1:
         start = time.time()
-        schedule, assignment, obj, delay = sgs_a(instance)
+        schedule, assignment, obj, delay = {"sgs_a": sgs_a, "sgs_i": sgs_i}[heuristic](instance)
         runtime = time.time() - start
         print(f"[INFO] Heuristic executed in {runtime:.4f} sec")
+        print(instance_idx, (obj, delay))
+        return
 
-        # 결과 출력
-        # print(f"[INFO] Instance: C={n_cranes}, J={n_jobs}, idx={instance_idx}")
-        # print(f"obj={obj}, delay={delay}, runtime={runtime:.4f} sec")
-        # print()
-
-        results.append((obj, delay))
-    results.sort(key=lambda x: (x[1], x[0]))
-    print(instance_idx, results[0])
-
+    # multi-start: 동일 ES 작업 / 동일 E 크레인 사이 랜덤 타이브레이크, 최선 (delay, obj)만 반환
+    start = time.time()
+    best = multistart(instance, n_sampling, heuristic=heuristic, seed=seed, n_workers=n_workers)
+    runtime = time.time() - start
+    print(f"[INFO] {n_sampling} samples on {n_workers} workers in {runtime:.4f} sec")
+    if best is None:
+        print(instance_idx, None)
+        return
+    delay, obj, k = best
+    print(instance_idx, (obj, delay), f"sample={k}")
 
 if __name__ == "__main__":
     # for n_cranes in [2, 3]:
@@ -53,5 +55,8 @@ if __name__ == "__main__":
             n_cranes=2,
             n_jobs=100,
             instance_idx=idx,
-            n_sampling=1
+            n_sampling=1,
+            heuristic="sgs_a",
+            n_workers=1,
+            seed=0,
         )
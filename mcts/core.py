@@ -1,16 +1,31 @@
 from __future__ import annotations
 from dataclasses import dataclass, field
 from typing import Dict, Optional, Tuple, List, Any
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 import math
 import random
+import time
 
 from sgs.sgs_ops import (
-    SGSState, build_initial_state, ready_tasks, compute_est, apply_action, compute_obj_delay
+    SGSState, build_initial_state, ready_tasks, compute_est, apply_action, compute_obj_delay,
+    apply_action_inplace, rewind, ReadyQueue, window_start, conflict_release,
+    start_lower_bounds, lower_bound_obj_delay,
 )
 
 # action: (task, crane)
 Action = Tuple[int, int]
 
+# MCTS.stats() counters; t_* are seconds spent in each phase of _grow
+STAT_KEYS = (
+    "iterations", "t_select", "t_expand", "t_simulate", "t_backprop",
+    "compute_est", "nodes", "max_depth", "rollouts", "rollout_steps",
+    "pruned", "rollouts_cut", "rollout_steps_saved",
+)
+
+# completed rollout: (obj, delay, reward, trajectory of (t, v, est)); obj/delay are None on failure
+Rollout = Tuple[Optional[float], Optional[float], float, Tuple[Tuple[int, int, float], ...]]
+
 @dataclass
 class Node:
     state: SGSState
@@ -26,6 +41,10 @@ class Node:
 
     expended_est: Optional[float] = None
 
+    # actions dropped by bound pruning in search number pruned_in
+    pruned: List[Action] = field(default_factory=list)
+    pruned_in: int = -1
+
     def is_fully_expanded(self) -> bool:
         return len(self.untried_actions) == 0
 
@@ -54,14 +73,73 @@ class MCTS:
         n_rollout_limit: Optional[int] = None,
         reward_fail: float = -2.5,
         final_action: str = "visits",  # "visits" or "q"
+        inplace_rollout: bool = True,
+        n_workers: int = 1,            # >1: root-parallel search over worker processes
+        partition_root: bool = True,   # root-parallel: split root actions across workers
+        reuse_tree: bool = False,      # keep the chosen subtree as the next move's root
+        transpositions: bool = False,  # share nodes between action orders reaching the same state
+        tt_size: int = 100_000,        # transposition table capacity (LRU)
+        rollout_cache: bool = False,   # memoize SGS-I rollouts by state key
+        rollout_cache_size: int = 100_000,
+        widening: bool = False,        # progressive widening: at most ceil(pw_c * N^pw_alpha) children
+        pw_c: float = 1.0,
+        pw_alpha: float = 0.5,
+        bounds: bool = False,          # prune children / cut rollouts that cannot beat the best schedule found
     ):
         self.instance = instance
         self.refs = refs
+        self.seed = seed
         self.rng = random.Random(seed)
         self.c_uct = c_uct
         self.n_rollout_limit = n_rollout_limit
         self.reward_fail = reward_fail
         self.final_action = final_action
+        self.inplace_rollout = inplace_rollout
+        self.n_workers = n_workers
+        self.partition_root = partition_root
+        self.reuse_tree = reuse_tree
+
+        self._root: Optional[Node] = None
+
+        # transposition table: state key -> Node, least recently used first
+        self.transpositions = transpositions
+        self.tt_size = tt_size
+        self._tt: "OrderedDict[int, Node]" = OrderedDict()
+        self.tt_hits = 0
+        self.tt_evictions = 0
+
+        # rollout cache: state key -> (state, Rollout), least recently used first
+        self.rollout_cache = rollout_cache
+        self.rollout_cache_size = rollout_cache_size
+        self._rc: "OrderedDict[int, Tuple[SGSState, Rollout]]" = OrderedDict()
+        self.rollout_hits = 0
+        self.rollout_misses = 0
+        self.rollout_evictions = 0
+
+        # progressive widening: children admitted in (ES, t, v) order as N grows
+        self.widening = widening
+        self.pw_c = pw_c
+        self.pw_alpha = pw_alpha
+
+        # bounds: reward of the best complete SGS-I rollout of the current search
+        self.bounds = bounds
+        self._incumbent = -float("inf")
+        self._n_grows = 0  # numbers the searches, so actions pruned in an earlier one are re-admitted
+        self._last_bound: Optional[Tuple[SGSState, int, Tuple[float, float, float, List[float]]]] = None
+        self._in_obj = bytearray(max(instance["T"]) + 1 if instance["T"] else 0)
+        for t in instance["T^obj"]:
+            self._in_obj[t] = 1
+
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._n_searches = 0
+
+        self._stats: Dict[str, float] = dict.fromkeys(STAT_KEYS, 0)
+
+        # rollout scratch: one state mutated in place and rewound via _undo_log
+        self._scratch: Optional[SGSState] = None
+        self._scratch_src: Optional[SGSState] = None
+        self._scratch_key: Optional[int] = None
+        self._undo_log: list = []
 
     # ---------- action generation ----------
     def legal_actions(self, st: SGSState) -> List[Action]:
@@ -82,30 +160,257 @@ class MCTS:
         t, v = action
         if est is None:
             est = compute_est(self.instance, st, t, v)
+            self._stats["compute_est"] += 1
         return apply_action(self.instance, st, t, v, est)
 
+    def _rollout_state(self, st: SGSState) -> SGSState:
+        """
+        State a rollout from st may mutate. In in-place mode this is the shared
+        scratch, synced to st unless it already mirrors st: same object with
+        the same key, so st changed in place since (apply_action_inplace
+        updates the key) is synced again.
+        """
+        if not self.inplace_rollout:
+            return st
+        if self._scratch is None:
+            self._scratch = st.snapshot()
+        elif self._scratch_src is not st or self._scratch_key != st.key:
+            self._scratch.assign(st)
+        self._scratch_src = st
+        self._scratch_key = st.key
+        return self._scratch
+
+    def _rollout_step(self, cur: SGSState, action: Action, est=None) -> SGSState:
+        if not self.inplace_rollout:
+            return self.step(cur, action, est=est)[0]
+        t, v = action
+        if est is None:
+            est = compute_est(self.instance, cur, t, v)
+            self._stats["compute_est"] += 1
+        apply_action_inplace(self.instance, cur, t, v, est, self._undo_log)
+        return cur
+
     # ---------- MCTS loop ----------
-    def search(self, root_state: SGSState, n_iter: int) -> Tuple[Optional[Action], Node]:
+    def search(
+        self, root_state: SGSState, n_iter: Optional[int] = None, time_budget: Optional[float] = None
+    ) -> Tuple[Optional[Action], Node]:
+        """
+        Grow the tree for n_iter iterations and/or time_budget seconds, whichever
+        runs out first, and return the best root action found so far.
+        """
+        if n_iter is None and time_budget is None:
+            raise ValueError("search needs n_iter or time_budget")
+        if self.n_workers > 1:
+            return self._search_root_parallel(root_state, n_iter, time_budget)
+
+        root = self._reused_root(root_state) if self.reuse_tree else None
+        if root is None:
+            root = self._new_root(root_state)
+        assert root.state is root_state or root.state.same_schedule(root_state), "reused root is not root_state"
+        if self.transpositions:
+            self._tt_reset(root)
+        if time_budget is not None and len(root.children) + len(root.untried_actions) == 1:
+            n_iter = 1  # forced move, nothing to spend the budget on
+        self._grow(root, n_iter, _deadline(time_budget))
+        if self.reuse_tree:
+            self._root = root
+        return self._choose_final_action(root)
+
+    def _reused_root(self, root_state: SGSState) -> Optional[Node]:
+        """
+        Child of the previous root whose state is root_state (the move that was
+        played), detached so the rest of the old tree can be freed. The whole
+        schedule is compared: (t, v1) and (t, v2) often give t the same start,
+        so S alone does not tell which crane was played.
+        """
+        prev, self._root = self._root, None
+        if prev is None:
+            return None
+        for child in prev.children.values():
+            if child.state.key == root_state.key and child.state.same_schedule(root_state):
+                child.parent = None
+                child.parent_action = None
+                return child
+        return None
+
+    def _new_root(self, root_state: SGSState) -> Node:
+        self._stats["nodes"] += 1
         root = Node(state=root_state)
         root.untried_actions = self.legal_actions(root_state)
         self.rng.shuffle(root.untried_actions)
-
-        for _ in range(n_iter):
-            leaf = self._select(root)
-            expanded = self._expand2(leaf)
+        return root
+
+    def _grow(self, root: Node, n_iter: Optional[int], deadline: Optional[float] = None) -> None:
+        stats = self._stats
+        clock = time.perf_counter
+        # complete schedules from an earlier search may not be reachable from root
+        self._incumbent = -float("inf")
+        self._n_grows += 1
+        # always at least one iteration so the root has an action to return
+        it = 0
+        while n_iter is None or it < n_iter:
+            t0 = clock()
+            if it and deadline is not None and t0 >= deadline:
+                break
+            it += 1
+            path = self._select(root)
+            t1 = clock()
+            expanded = self._expand2(path[-1])
+            if expanded is not path[-1]:
+                path.append(expanded)
+            t2 = clock()
             reward = self._simulate_sgs_i(expanded.state)
-            self._backprop2(expanded, reward)
+            t3 = clock()
+            self._backprop2(path, reward)
+
+            stats["t_select"] += t1 - t0
+            stats["t_expand"] += t2 - t1
+            stats["t_simulate"] += t3 - t2
+            stats["t_backprop"] += clock() - t3
+            if len(path) - 1 > stats["max_depth"]:
+                stats["max_depth"] = len(path) - 1  # below the search root
+        stats["iterations"] += it
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Counters and phase timers accumulated over every search so far, plus
+        rollouts_per_sec (over simulate time), avg_rollout_len and the
+        transposition / rollout cache counters. t_saved_est prices the
+        rollout steps skipped by bound cutoffs at the mean time per step run.
+        """
+        out = dict(self._stats)
+        out["rollouts_per_sec"] = out["rollouts"] / out["t_simulate"] if out["t_simulate"] else 0.0
+        out["avg_rollout_len"] = out["rollout_steps"] / out["rollouts"] if out["rollouts"] else 0.0
+        out["t_saved_est"] = (
+            out["rollout_steps_saved"] * out["t_simulate"] / out["rollout_steps"] if out["rollout_steps"] else 0.0
+        )
+        out["tt_hits"] = self.tt_hits
+        out["tt_evictions"] = self.tt_evictions
+        out.update(self.rollout_cache_stats())
+        return out
+
+    def _take_stats(self) -> Dict[str, float]:
+        # hand over the raw counters and start from zero (root-parallel workers)
+        out, self._stats = self._stats, dict.fromkeys(STAT_KEYS, 0)
+        return out
+
+    def _add_stats(self, other: Dict[str, float]) -> None:
+        for k, x in other.items():
+            if k == "max_depth":
+                self._stats[k] = max(self._stats[k], x)
+            else:
+                self._stats[k] += x
+
+    # ---------- transposition table ----------
+    def _tt_reset(self, root: Node) -> None:
+        # entries at or above the root's depth can no longer be reached
+        n_left = root.state.n_left
+        self._tt = OrderedDict((k, n) for k, n in self._tt.items() if n.state.n_left < n_left)
+        self._tt_put(root)
+
+    def _tt_get(self, st: SGSState) -> Optional[Node]:
+        node = self._tt.get(st.key)
+        if node is None or not node.state.same_schedule(st):
+            return None
+        self._tt.move_to_end(st.key)
+        self.tt_hits += 1
+        return node
+
+    def _tt_put(self, node: Node) -> None:
+        self._tt[node.state.key] = node
+        self._tt.move_to_end(node.state.key)
+        if len(self._tt) > self.tt_size:
+            self._tt.popitem(last=False)
+            self.tt_evictions += 1
 
+    # ---------- root parallelism ----------
+    def _search_root_parallel(self, root_state: SGSState, n_iter: Optional[int], time_budget: Optional[float]):
+        """
+        Root parallelism: each worker grows its own tree from root_state for
+        n_iter iterations with its own RNG stream, then root child stats are
+        merged (N summed, best Q kept) and the action picked as usual.
+
+        Expansion order and the SGS-I rollout are deterministic, so trees that
+        differ only by RNG would be identical; with partition_root each worker
+        owns every n_workers-th root action in (ES, t, v) order instead.
+        """
+        if self._pool is None:
+            config = dict(
+                c_uct=self.c_uct,
+                n_rollout_limit=self.n_rollout_limit,
+                reward_fail=self.reward_fail,
+                final_action=self.final_action,
+                inplace_rollout=self.inplace_rollout,
+                transpositions=self.transpositions,
+                tt_size=self.tt_size,
+                rollout_cache=self.rollout_cache,
+                rollout_cache_size=self.rollout_cache_size,
+                widening=self.widening,
+                pw_c=self.pw_c,
+                pw_alpha=self.pw_alpha,
+                bounds=self.bounds,
+            )
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.n_workers,
+                initializer=_init_root_worker,
+                initargs=(self.instance, self.refs, config),
+            )
+
+        move = self._n_searches
+        self._n_searches += 1
+        n_parts = self.n_workers if self.partition_root else 1
+        futures = [
+            self._pool.submit(
+                _root_worker_search, root_state, n_iter,
+                f"{self.seed}:{move}:{k}", k % n_parts, n_parts, time_budget,
+            )
+            for k in range(self.n_workers)
+        ]
+
+        root = Node(state=root_state)
+        for fut in futures:
+            children, stats = fut.result()
+            self._add_stats(stats)
+            for action, (n, q, est) in children.items():
+                ch = root.children.get(action)
+                if ch is None:
+                    ch = root.children[action] = Node(
+                        state=None, parent=root, parent_action=action, expended_est=est
+                    )
+                ch.N += n
+                ch.W = max(ch.W, q)
+                ch.Q = ch.W
+                root.N += n
         return self._choose_final_action(root)
 
-    def _select(self, node: Node) -> Node:
-        # walk down by UCT while fully expanded
-        while node.state.U and node.is_fully_expanded() and node.children:
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def _select(self, node: Node) -> List[Node]:
+        # walk down by UCT while fully expanded; returns the root-to-leaf path
+        path = [node]
+        while node.state.n_left and node.children and not self._can_widen(node):
             node = node.uct_select_child(self.c_uct)
-        return node
+            path.append(node)
+        return path
+
+    def _can_widen(self, node: Node) -> bool:
+        # without widening a node takes a new child until fully expanded; with it,
+        # only while it has fewer than ceil(pw_c * N^pw_alpha) children (at least 1)
+        if node.pruned and node.pruned_in != self._n_grows:
+            # pruned against an earlier search's incumbent (reused tree): try them again
+            node.untried_actions.extend(node.pruned)
+            node.pruned = []
+        if not node.untried_actions:
+            return False
+        if not self.widening:
+            return True
+        return len(node.children) < max(1, math.ceil(self.pw_c * node.N ** self.pw_alpha))
 
     def _expand(self, node: Node) -> Node:
-        if not node.state.U:
+        if not node.state.n_left:
             return node
         if not node.untried_actions:
             return node
@@ -113,6 +418,7 @@ class MCTS:
         action = node.untried_actions.pop()
         nxt, est = self.step(node.state, action)
 
+        self._stats["nodes"] += 1
         child = Node(state=nxt, parent=node, parent_action=action)
         child.untried_actions = self.legal_actions(nxt)
         self.rng.shuffle(child.untried_actions)
@@ -122,130 +428,218 @@ class MCTS:
         return child
     
     def _expand2(self, node: Node) -> Node:
-        if not node.state.U:
+        if not node.state.n_left:
             return node
-        if not node.untried_actions:
+        if not self._can_widen(node):
             return node
 
         # action = node.untried_actions.pop()
         node.untried_actions.sort(key=lambda x:(node.state.ES[x[0]], x[0], x[1]), reverse=True)
-        action = node.untried_actions.pop()
-        nxt, est = self.step(node.state, action)
-        if action == (10,3):
-            pass
-
+        while True:
+            action = node.untried_actions.pop()
+            nxt, est = self.step(node.state, action)
+            if not self.bounds or self._reward_bound(nxt)[0] >= self._incumbent:
+                break
+            # no completion of nxt beats the best schedule found: set the action
+            # aside for the rest of this search
+            self._stats["pruned"] += 1
+            node.pruned.append(action)
+            node.pruned_in = self._n_grows
+            if not self._can_widen(node):
+                return node
+
+        if self.transpositions:
+            shared = self._tt_get(nxt)
+            if shared is not None:
+                node.children[action] = shared
+                return shared
+
+        self._stats["nodes"] += 1
         child = Node(state=nxt, parent=node, parent_action=action)
         child.untried_actions = self.legal_actions(nxt)
         self.rng.shuffle(child.untried_actions)
         child.expended_est = est
 
         node.children[action] = child
+        if self.transpositions:
+            self._tt_put(child)
         return child
 
     def _simulate(self, st: SGSState) -> float:
         """
         Rollout policy: RANDOM task + RANDOM crane, then compute time like SGS-A.
         """
-        cur = st
+        cur = self._rollout_state(st)
+        mark = len(self._undo_log)
         steps = 0
+        try:
 
-        while cur.U:
-            A = ready_tasks(cur)
-            if not A:
-                return self.reward_fail
+            while cur.n_left:
+                A = ready_tasks(cur)
+                if not A:
+                    return self.reward_fail
 
-            t = self.rng.choice(A)
+                t = self.rng.choice(A)
 
-            Vt = self.instance["V_tau"][t]
-            if not Vt:
-                return self.reward_fail
-            v = self.rng.choice(list(Vt))
+                Vt = self.instance["V_tau"][t]
+                if not Vt:
+                    return self.reward_fail
+                v = self.rng.choice(list(Vt))
 
-            cur, _ = self.step(cur, (t, v))
+                cur = self._rollout_step(cur, (t, v))
 
-            steps += 1
-            if self.n_rollout_limit is not None and steps >= self.n_rollout_limit:
-                return self.reward_fail
+                steps += 1
+                if self.n_rollout_limit is not None and steps >= self.n_rollout_limit:
+                    return self.reward_fail
 
-        obj, delay = compute_obj_delay(self.instance, cur)
-        return self._reward(obj, delay)
+            obj, delay = compute_obj_delay(self.instance, cur)
+            return self._reward(obj, delay)
+        finally:
+            self._stats["rollouts"] += 1
+            self._stats["rollout_steps"] += steps
+            if self.inplace_rollout:
+                rewind(cur, self._undo_log, mark)
 
     def _simulate_sgs_i(self, st: SGSState) -> float:
-        cur = st
-        steps = 0
+        cutoff = self._incumbent if self.bounds else None
+        if self.rollout_cache:
+            obj, _, reward, _ = self.cached_rollout(st, cutoff)
+        else:
+            obj, _, reward, _ = self._rollout_sgs_i(st, cutoff)
+        if obj is not None and reward > self._incumbent:
+            self._incumbent = reward
+        return reward
 
+    def _reward_bound(self, st: SGSState) -> Tuple[float, float, float, List[float]]:
+        """
+        Upper bound on the _reward2 of any completion of st, with the obj /
+        delay lower bounds and per-task start lower bounds it comes from.
+        The last result is kept for the rollout of a just-expanded child,
+        keyed by object and st.key so a state changed in place is recomputed.
+        """
+        last = self._last_bound
+        if last is not None and last[0] is st and last[1] == st.key:
+            return last[2]
+        lb = start_lower_bounds(self.instance, st)
+        obj, delay = lower_bound_obj_delay(self.instance, st, lb)
+        res = self._reward2(obj, delay), obj, delay, lb
+        self._last_bound = (st, st.key, res)
+        return res
+
+    def cached_rollout(self, st: SGSState, cutoff: Optional[float] = None) -> Rollout:
+        """
+        SGS-I completion of st, memoized: the rollout has no randomness, so a
+        state reached again (revisit, transposition, next move) reuses it.
+        st must not be mutated afterwards; tree node states never are.
+        Rollouts cut short by cutoff are not stored.
+        """
+        hit = self._rc.get(st.key)
+        if hit is not None and hit[0].same_schedule(st):
+            self._rc.move_to_end(st.key)
+            self.rollout_hits += 1
+            return hit[1]
+
+        self.rollout_misses += 1
+        n_cut = self._stats["rollouts_cut"]
+        res = self._rollout_sgs_i(st, cutoff)
+        if self._stats["rollouts_cut"] != n_cut:
+            return res
+        self._rc[st.key] = (st, res)
+        self._rc.move_to_end(st.key)
+        if len(self._rc) > self.rollout_cache_size:
+            self._rc.popitem(last=False)
+            self.rollout_evictions += 1
+        return res
+
+    def rollout_cache_stats(self) -> Dict[str, float]:
+        lookups = self.rollout_hits + self.rollout_misses
+        return {
+            "rollout_hits": self.rollout_hits,
+            "rollout_misses": self.rollout_misses,
+            "rollout_evictions": self.rollout_evictions,
+            "rollout_hit_rate": self.rollout_hits / lookups if lookups else 0.0,
+        }
+
+    def _rollout_sgs_i(self, st: SGSState, cutoff: Optional[float] = None) -> Rollout:
+        """
+        SGS-I completion of st. With cutoff, the rollout stops as soon as an
+        upper bound on its reward falls below cutoff and returns that bound as
+        the reward (obj / delay None). The bound starts from _reward_bound(st)
+        and is tightened as each task's start replaces its lower bound.
+        """
+        V_tau = self.instance["V_tau"]
+        l1 = self.instance["l^1"]
+        that = self.instance["hat(t)"]
+        ls = self.instance["ls"]
+        h = self.instance["h"]
+        by_crane = self.instance["conflicts_by_crane"]
+
+        if cutoff is not None:
+            in_obj, b = self._in_obj, self.instance["b"]
+            bound, obj_lb, delay_lb, lb = self._reward_bound(st)
+
+        cur = self._rollout_state(st)
+        mark = len(self._undo_log)
+        ready = ReadyQueue(cur.ES, cur.R)
         traj = []
-        while cur.U:
-            A = ready_tasks(cur)
-            if not A:
-                return self.reward_fail
-            A.sort(key=lambda x:(cur.ES[x],x))
-
-            t = A[0]
-
-            if t == 32:
-                pass
-
-            Vprime = list()
-            E = dict()
-
-            Vt = self.instance["V_tau"][t]
-            if not Vt:
-                return self.reward_fail
-            
-            for v1 in Vt:
-                R = []
-                est = max(cur.ES[t], cur.C[v1] + abs(self.instance["l^1"][t] - cur.L[v1]) * self.instance["hat(t)"])
-
-                if est <= self.instance["ls"][t]:
-                    R.append((est, self.instance["ls"][t]))
-
-                    for v2 in Vt:
-                        if v2 == v1:
-                            continue
-                        for t2 in cur.G[v2]:
-                            if (t2, t, v2, v1) in self.instance["Theta"]:
-                                Rprime = []
-                                
-                                for (es_t1, ls_t1) in R:
-                                    new_ls = min(ls_t1, cur.S[t2] - self.instance['Delta'][(t, t2, v1, v2)] - self.instance['h'][t])
-                                    if es_t1 <= new_ls:
-                                        Rprime.append((es_t1, new_ls))
-                                    
-                                    new_es = max(es_t1, cur.S[t2] + self.instance['h'][t2] + self.instance['Delta'][(t2, t, v2, v1)])
-                                    if new_es <= ls_t1:
-                                        Rprime.append((new_es, ls_t1))
-                                
-                                R = Rprime
-                
-                if R:
-                    R.sort(key=lambda x:x[0])
-                    E[v1] = R[0][0]
-                else:
-
-                    for v2 in Vt:
-                        if v2 == v1:
-                            continue
-                        for t2 in cur.G[v2]:
-                            if (t2, t, v2, v1) in self.instance["Theta"]:
-                                est = max(est, cur.S[t2] + self.instance['h'][t2] + self.instance['Delta'][(t2, t, v2, v1)])
-                    E[v1] = est
-                
-                Vprime.append(v1)
-            
-            v = min(Vprime, key=lambda x:(E[x],x))
-
-            cur, _ = self.step(cur, (t, v), est=E[v])
-            traj.append((t, v, E[v]))
-
-            steps += 1
-            if self.n_rollout_limit is not None and steps >= self.n_rollout_limit:
-                return self.reward_fail
-
-        obj, delay = compute_obj_delay(self.instance, cur)
-        # print(obj, delay)
-        # print(traj)
-        return self._reward2(obj, delay)
+        steps = n_est = 0
+        try:
+            if cutoff is not None and bound < cutoff:
+                self._cut_rollout(cur.n_left)
+                return None, None, bound, tuple(traj)
+
+            while cur.n_left:
+                t = ready.pop()
+                if t is None:
+                    return None, None, self.reward_fail, tuple(traj)
+                ES, TL = cur.ES, cur.TL
+
+                Vt = V_tau[t]
+                if not Vt:
+                    return None, None, self.reward_fail, tuple(traj)
+
+                n_est += len(Vt)
+                v, best = None, None
+                for v1 in Vt:
+                    est = max(ES[t], cur.C[v1] + abs(l1[t] - cur.L[v1]) * that)
+                    e = window_start(est, ls[t], by_crane[t, v1], TL, h, t)
+                    if e is None:
+                        e = conflict_release(est, by_crane[t, v1], TL, h)
+
+                    if best is None or (e, v1) < (best, v):
+                        v, best = v1, e
+
+                cur = self._rollout_step(cur, (t, v), est=best)
+                traj.append((t, v, best))
+                for j, _ in cur.W[t]:
+                    if not cur.Q[j]:
+                        ready.push(j, cur.ES[j])
+
+                steps += 1
+                if cutoff is not None and best > lb[t]:
+                    if in_obj[t]:
+                        obj_lb += best - lb[t]
+                    delay_lb += max(0.0, best - b[t]) - max(0.0, lb[t] - b[t])
+                    bound = self._reward2(obj_lb, delay_lb)
+                    if bound < cutoff:
+                        self._cut_rollout(cur.n_left)
+                        return None, None, bound, tuple(traj)
+                if self.n_rollout_limit is not None and steps >= self.n_rollout_limit:
+                    return None, None, self.reward_fail, tuple(traj)
+
+            obj, delay = compute_obj_delay(self.instance, cur)
+            return obj, delay, self._reward2(obj, delay), tuple(traj)
+        finally:
+            stats = self._stats
+            stats["rollouts"] += 1
+            stats["rollout_steps"] += steps
+            stats["compute_est"] += n_est
+            if self.inplace_rollout:
+                rewind(cur, self._undo_log, mark)
+
+    def _cut_rollout(self, n_left: int) -> None:
+        self._stats["rollouts_cut"] += 1
+        self._stats["rollout_steps_saved"] += n_left
 
     def _reward(self, obj: float, delay: float) -> float:
         """
@@ -286,19 +680,70 @@ class MCTS:
             cur.Q = cur.W / cur.N
             cur = cur.parent
 
-    def _backprop2(self, node: Node, reward: float) -> None:
-        cur = node
-        while cur is not None:
+    def _backprop2(self, path: List[Node], reward: float) -> None:
+        # along the selected path: with transpositions a node can have several parents
+        for cur in path:
             cur.N += 1
             cur.W = max(cur.W, reward)
             cur.Q = cur.W
-            cur = cur.parent
 
     def _choose_final_action(self, root: Node) -> Optional[Action]:
         if not root.children:
             return None
         if self.final_action == "q":
             action = max(root.children.items(), key=lambda kv: kv[1].Q)[0]
-            return action, root.children[action].expended_est
+            return action, self._edge_est(root.children[action], action)
         action = max(root.children.items(), key=lambda kv: kv[1].N)[0]
-        return action, root.children[action].expended_est
+        return action, self._edge_est(root.children[action], action)
+
+    @staticmethod
+    def _edge_est(child: Node, action: Action) -> Optional[float]:
+        # a transposition child may have been expanded from another parent, so
+        # read the start time of this edge's task from its state
+        if child.state is None:  # merged root-parallel stats
+            return child.expended_est
+        return child.state.S[action[0]]
+
+
+# ---------- time budget ----------
+def _deadline(time_budget: Optional[float]) -> Optional[float]:
+    return None if time_budget is None else time.perf_counter() + time_budget
+
+def split_budget(time_left: float, n_actions: int, n_left: int, mean_actions: float) -> float:
+    """
+    Share of time_left for the current move when a whole instance has one
+    budget: proportional to this move's branching factor n_actions against
+    mean_actions for each of the other n_left - 1 moves. Forced moves get 0.
+    """
+    if n_actions <= 1:
+        return 0.0
+    rest = max(mean_actions, 1.0) * (n_left - 1)
+    return max(0.0, time_left) * n_actions / (n_actions + rest)
+
+
+# ---------- root-parallel worker side ----------
+_ROOT_WORKER: Dict[str, Any] = {}
+
+def _init_root_worker(instance: Dict[str, Any], refs: Dict[str, float], config: Dict[str, Any]) -> None:
+    _ROOT_WORKER["mcts"] = MCTS(instance, refs, **config)
+
+def _root_worker_search(
+    root_state: SGSState, n_iter: Optional[int], seed: str, part: int, n_parts: int,
+    time_budget: Optional[float] = None,
+) -> Tuple[Dict[Action, Tuple[int, float, Optional[float]]], Dict[str, float]]:
+    deadline = _deadline(time_budget)
+    mcts: MCTS = _ROOT_WORKER["mcts"]
+    mcts.rng.seed(seed)
+
+    root = mcts._new_root(root_state)
+    if n_parts > 1:
+        ES = root_state.ES
+        order = sorted(root.untried_actions, key=lambda x:(ES[x[0]], x[0], x[1]))
+        mine = set(order[part::n_parts])
+        root.untried_actions = [a for a in root.untried_actions if a in mine]
+    if mcts.transpositions:
+        mcts._tt_reset(root)
+    mcts._grow(root, n_iter, deadline)
+
+    children = {a: (ch.N, ch.Q, MCTS._edge_est(ch, a)) for a, ch in root.children.items()}
+    return children, mcts._take_stats()
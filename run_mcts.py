@@ -1,13 +1,15 @@
 from __future__ import annotations
 
-import csv
+import inspect
 import os
 import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 from utils.load_instance import load_instance
 from sgs.sgs_ops import build_initial_state, compute_obj_delay
 from mcts.refs import compute_refs
-from mcts.core import MCTS
+from mcts.core import MCTS, split_budget
+from utils.results import ResultsStore, job_config, config_hash
 
 from tqdm import tqdm
 
@@ -17,16 +19,10 @@ def inst_path(inst_dir: str, n_cranes: int, n_jobs: int, idx: int) -> str:
     return os.path.join(inst_dir, f"{n_cranes}_{n_jobs}_{idx}.json")
 
 
-def append_row(csv_path: str, row: dict) -> None:
-    is_new = not os.path.exists(csv_path)
-    with open(csv_path, "a", newline="") as f:
-        w = csv.DictWriter(f, fieldnames=list(row.keys()))
-        if is_new:
-            w.writeheader()
-        w.writerow(row)
-
-
-def run_one(inst_file: str, seed: int, iters_per_move: int, c_uct: float, final_action: str):
+def run_one(inst_file: str, seed: int, iters_per_move: int, c_uct: float, final_action: str,
+            progress: bool = True, root_workers: int = 1, reuse_tree: bool = False,
+            rollout_cache: bool = False, time_budget: float | None = None, widening: bool = False,
+            bounds: bool = False):
     t0 = time.time()
     inst = load_instance(inst_file, apply_rules=True)
 
@@ -35,27 +31,43 @@ def run_one(inst_file: str, seed: int, iters_per_move: int, c_uct: float, final_
 
     # MCTS constructive
     st = build_initial_state(inst)
-    mcts = MCTS(inst, refs, seed=seed, c_uct=c_uct, final_action=final_action)
+    mcts = MCTS(inst, refs, seed=seed, c_uct=c_uct, final_action=final_action, n_workers=root_workers,
+                reuse_tree=reuse_tree, rollout_cache=rollout_cache, widening=widening,
+                bounds=bounds)
+
+    # time_budget: seconds of search for the whole instance, spread over the moves
+    # by branching factor; iters_per_move (if set) still caps each move
+    deadline = None if time_budget is None else time.perf_counter() + time_budget
+    seen_actions, n_moves = 0, 0
 
     ok = True
-    for _ in tqdm(range(len(inst["T"]))):
-        action, est = mcts.search(st, n_iter=iters_per_move)
-        if action is None:
-            ok = False
-            break
-        st, _ = mcts.step(st, action, est=est)
-        # print(action)
-        if action == (14,4):
-            pass
-    assert st.U == set()
-
-    if ok and not st.U:
+    try:
+        for _ in tqdm(range(len(inst["T"])), disable=not progress):
+            budget = None
+            if deadline is not None:
+                n_actions = len(mcts.legal_actions(st))
+                seen_actions, n_moves = seen_actions + n_actions, n_moves + 1
+                budget = split_budget(deadline - time.perf_counter(), n_actions, st.n_left,
+                                      seen_actions / n_moves)
+            action, est = mcts.search(st, n_iter=iters_per_move, time_budget=budget)
+            if action is None:
+                ok = False
+                break
+            st, _ = mcts.step(st, action, est=est)
+            # print(action)
+            if action == (14,4):
+                pass
+    finally:
+        mcts.close()
+    assert st.n_left == 0
+
+    if ok and not st.n_left:
         mcts_obj, mcts_delay = compute_obj_delay(inst, st)
     else:
         mcts_obj, mcts_delay = float("inf"), float("inf")
 
     wall = time.time() - t0
-    return ok, refs['obj_ref'], 0, mcts_obj, mcts_delay, wall
+    return ok, refs['obj_ref'], 0, mcts_obj, mcts_delay, wall, mcts.stats()
 
 
 
@@ -74,63 +86,143 @@ CFG = {
     "iters_per_move": 10,
     "c_uct": 0,
     "final_action": "q",  # "visits" or "q"
+    "root_workers": 1,    # >1: root-parallel MCTS per move (use with n_workers=1)
+    "reuse_tree": False,  # keep the chosen subtree between moves
+    "rollout_cache": False,  # memoize SGS-I rollouts (same results, fewer rollouts)
+    "widening": False,    # progressive widening: admit root/node children as N grows, in (ES, t, v) order
+    "bounds": False,      # prune children / cut SGS-I rollouts that cannot beat the best schedule found
+    "time_budget": None,  # seconds of search per instance (None = iters_per_move only)
+
+    # also store MCTS.stats() (phase times, rollouts/sec, nodes, ...) as stats_* fields of each row
+    "stats_columns": False,
 
     # seed policy
     "seed": 7,
     "seed_by_idx": True,  # seed + idx
 
-    # output
-    "out_csv": "results.csv",
+    # parallelism: 1 = run in this process (with progress bars)
+    "n_workers": 1,  # >1: jobs in a process pool, e.g. os.cpu_count() (skews time_budget timings)
+
+    # output: SQLite results store, one row per (file, seed, config); see utils/results.py
+    "out_db": "results.sqlite",
+    "resume": True,  # skip (file, seed, config) rows already in out_db
 }
 # =========================
 
-def main():
-    inst_dir = CFG["inst_dir"]
-    out_csv = CFG["out_csv"]
 
-    for ncr in CFG["n_cranes_list"]:
-        for nj in CFG["n_jobs_list"]:
-            for idx in CFG["idx_list"]:
-                f = inst_path(inst_dir, ncr, nj, idx)
+def make_jobs(cfg: dict) -> list:
+    jobs = []
+    for ncr in cfg["n_cranes_list"]:
+        for nj in cfg["n_jobs_list"]:
+            for idx in cfg["idx_list"]:
+                f = inst_path(cfg["inst_dir"], ncr, nj, idx)
                 if not os.path.exists(f):
                     print(f"[MISSING] {f}")
                     continue
-
-                seed = CFG["seed"] + idx if CFG["seed_by_idx"] else CFG["seed"]
-                ok, base_obj, base_delay, mcts_obj, mcts_delay, wall = run_one(
-                    inst_file=f,
-                    seed=seed,
-                    iters_per_move=CFG["iters_per_move"],
-                    c_uct=CFG["c_uct"],
-                    final_action=CFG["final_action"],
-                )
-
-                imp = (base_obj - mcts_obj) / abs(base_obj) if (ok and base_obj not in [0.0, float("inf")]) else 0.0
-
-                row = {
-                    "time": time.strftime("%Y-%m-%d %H:%M:%S"),
-                    "file": os.path.basename(f),
+                jobs.append({
+                    "inst_file": f,
                     "n_cranes": ncr,
                     "n_jobs": nj,
                     "idx": idx,
-                    "seed": seed,
-                    "iters_per_move": CFG["iters_per_move"],
-                    "c_uct": CFG["c_uct"],
-                    "final_action": CFG["final_action"],
-                    "ok": ok,
-                    "base_obj": base_obj,
-                    "base_delay": base_delay,
-                    "mcts_obj": mcts_obj,
-                    "mcts_delay": mcts_delay,
-                    "imp_ratio": imp,
-                    "wall_sec": wall,
-                }
-                append_row(out_csv, row)
-
-                print(
-                    f"[{row['file']}] ok={ok} base={base_obj:.6f} mcts={mcts_obj:.6f} "
-                    f"imp={imp:.6f} delay={mcts_delay:.6f} wall={wall:.2f}s"
-                )
+                    # fixed per job, independent of which worker runs it
+                    "seed": cfg["seed"] + idx if cfg["seed_by_idx"] else cfg["seed"],
+                    "iters_per_move": cfg["iters_per_move"],
+                    "c_uct": cfg["c_uct"],
+                    "final_action": cfg["final_action"],
+                    "root_workers": cfg["root_workers"],
+                    "reuse_tree": cfg["reuse_tree"],
+                    "rollout_cache": cfg["rollout_cache"],
+                    "widening": cfg["widening"],
+                    "bounds": cfg["bounds"],
+                    "time_budget": cfg["time_budget"],
+                })
+    return jobs
+
+
+# run_one's keyword defaults; job settings equal to these are left out of the config hash
+RUN_DEFAULTS = {
+    k: p.default for k, p in inspect.signature(run_one).parameters.items() if p.default is not p.empty
+}
+
+
+def job_key(job: dict) -> tuple:
+    return os.path.basename(job["inst_file"]), job["seed"], config_hash(job_config(job, RUN_DEFAULTS))
+
+
+def run_job(job: dict, progress: bool = True, stats_columns: bool = False) -> dict:
+    ok, base_obj, base_delay, mcts_obj, mcts_delay, wall, stats = run_one(
+        inst_file=job["inst_file"],
+        seed=job["seed"],
+        iters_per_move=job["iters_per_move"],
+        c_uct=job["c_uct"],
+        final_action=job["final_action"],
+        progress=progress,
+        root_workers=job["root_workers"],
+        reuse_tree=job["reuse_tree"],
+        rollout_cache=job["rollout_cache"],
+        widening=job["widening"],
+        bounds=job["bounds"],
+        time_budget=job["time_budget"],
+    )
+
+    imp = (base_obj - mcts_obj) / abs(base_obj) if (ok and base_obj not in [0.0, float("inf")]) else 0.0
+
+    row = {
+        "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "file": os.path.basename(job["inst_file"]),
+        "n_cranes": job["n_cranes"],
+        "n_jobs": job["n_jobs"],
+        "idx": job["idx"],
+        "seed": job["seed"],
+        "iters_per_move": job["iters_per_move"],
+        "c_uct": job["c_uct"],
+        "final_action": job["final_action"],
+        "root_workers": job["root_workers"],
+        "reuse_tree": job["reuse_tree"],
+        "time_budget": job["time_budget"],
+        "ok": ok,
+        "base_obj": base_obj,
+        "base_delay": base_delay,
+        "mcts_obj": mcts_obj,
+        "mcts_delay": mcts_delay,
+        "imp_ratio": imp,
+        "wall_sec": wall,
+        "rollout_hit_rate": stats["rollout_hit_rate"],
+    }
+    if stats_columns:
+        row.update({f"stats_{k}": x for k, x in stats.items()})
+    return row
+
+
+def report(store: ResultsStore, job: dict, row: dict) -> None:
+    # only the parent process writes to the store
+    store.add(row, job_config(job, RUN_DEFAULTS))
+    print(
+        f"[{row['file']}] ok={row['ok']} base={row['base_obj']:.6f} mcts={row['mcts_obj']:.6f} "
+        f"imp={row['imp_ratio']:.6f} delay={row['mcts_delay']:.6f} wall={row['wall_sec']:.2f}s"
+    )
+
+
+def main():
+    with ResultsStore(CFG["out_db"]) as store:
+        jobs = make_jobs(CFG)
+        if CFG["resume"]:
+            done = store.done_keys()
+            skipped = [j for j in jobs if job_key(j) in done]
+            jobs = [j for j in jobs if job_key(j) not in done]
+            if skipped:
+                print(f"[RESUME] skipping {len(skipped)} finished jobs")
+
+        n_workers = max(1, min(CFG["n_workers"], len(jobs)))
+        if n_workers == 1:
+            for job in jobs:
+                report(store, job, run_job(job, stats_columns=CFG["stats_columns"]))
+            return
+
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            futures = {pool.submit(run_job, job, False, CFG["stats_columns"]): job for job in jobs}
+            for fut in as_completed(futures):
+                report(store, futures[fut], fut.result())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,70 @@
+"""
+Multi-start SGS: many constructions of sgs_a / sgs_i with seeded random tie
+breaking, keeping only the best (delay, obj). Sample k always uses the RNG
+seeded "{seed}:{k}", so the result does not depend on how samples are split
+over workers.
+"""
+from __future__ import annotations
+
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+
+from sgs.sgs_a import sgs_a
+from sgs.sgs_i import sgs_i
+from sgs.sgs_ops import NoFeasibleCrane
+
+HEURISTICS = {"sgs_a": sgs_a, "sgs_i": sgs_i}
+
+# (delay, obj, sample index); compares best-first
+Sample = Tuple[float, float, int]
+
+
+def sample_range(instance: Dict[str, Any], heuristic: str, seed: int, start: int, stop: int) -> Optional[Sample]:
+    fn = HEURISTICS[heuristic]
+    best = None
+    for k in range(start, stop):
+        try:
+            _, _, obj, delay = fn(instance, rng=random.Random(f"{seed}:{k}"))
+        except NoFeasibleCrane:
+            continue
+        if best is None or (delay, obj, k) < best:
+            best = (delay, obj, k)
+    return best
+
+
+def multistart(
+    instance: Dict[str, Any],
+    n_samples: int,
+    heuristic: str = "sgs_a",
+    seed: int = 0,
+    n_workers: int = 1,
+    chunk: int = 64,
+) -> Optional[Sample]:
+    """
+    Best (delay, obj, sample index) over n_samples randomized runs, or None if
+    every run failed. With n_workers > 1 the samples go to a process pool in
+    chunks; each worker gets the instance once, at start-up.
+    """
+    if n_workers <= 1:
+        return sample_range(instance, heuristic, seed, 0, n_samples)
+
+    with ProcessPoolExecutor(
+        max_workers=n_workers, initializer=_init_worker, initargs=(instance,)
+    ) as pool:
+        futures = [
+            pool.submit(_worker_range, heuristic, seed, start, min(start + chunk, n_samples))
+            for start in range(0, n_samples, chunk)
+        ]
+        results = [r for r in (f.result() for f in futures) if r is not None]
+    return min(results) if results else None
+
+
+# ---------- worker side ----------
+_WORKER: Dict[str, Any] = {}
+
+def _init_worker(instance: Dict[str, Any]) -> None:
+    _WORKER["instance"] = instance
+
+def _worker_range(heuristic: str, seed: int, start: int, stop: int) -> Optional[Sample]:
+    return sample_range(_WORKER["instance"], heuristic, seed, start, stop)
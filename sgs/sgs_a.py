@@ -1,87 +1,74 @@
-import random
+from bisect import insort
 
-def sgs_a(instance):
+from sgs.sgs_ops import ReadyQueue, conflict_release
+
+def sgs_a(instance, rng=None):
+    # rng (random.Random): break ties between equal-ES tasks and equal-E cranes at random
 
     T = instance['T']
     a = instance['a']
     b = instance['b']
-    Xi = instance['Xi']
+    succ = instance['succ']
+    n_pred = instance['n_pred']
     V = instance['V']
     l0 = instance['l^0']
     Vt = instance['V_tau']
     l1 = instance['l^1']
     l2 = instance['l^2']
     that = instance['hat(t)']
-    Theta = instance['Theta']
     h = instance['h']
-    Delta = instance['Delta']
-    g = instance['g']
+    by_crane = instance['conflicts_by_crane']
     Tobj = instance['T^obj']
     r = instance['r']
-    crane_tr = instance['crane_tr']
 
     S, ES, W, Q, G, C, L = {}, {}, {}, {}, {}, {}, {}
 
     for t in T:
         ES[t] = a[t]
-        W[t] = set(t2 for t2 in T if (t, t2) in Xi)
-        Q[t] = len(set(t2 for t2 in T if (t2, t) in Xi))
+        W[t] = succ[t]
+        Q[t] = n_pred[t]
     
+    TL = {}  # (S[t], t) per crane, sorted by start time
     for v in V:
         G[v] = set()
+        TL[v] = []
         C[v] = 0
         L[v] = l0[v]
 
     U = set(T)
+    ready = ReadyQueue(ES, [t for t in T if Q[t] == 0])
 
     while U:
-        A = set(t for t in U if Q[t] == 0)
-        tstar = min(A, key=lambda t: ES[t])
-
-
-        # min_val = min(ES[t] for t in A)
-        # tstars = [t for t in A if ES[t] == min_val]
-        # if len(tstars) > 1:
-        #     pass
-        # tstar = random.choice(tstars)
-
+        tstar = ready.pop(rng)
 
         Vprime = set()
         E = dict()
 
         for v in Vt[tstar]:
             est = max(ES[tstar], C[v] + abs(l1[tstar] - L[v]) * that)
-            for vprime in V:
-                if crane_tr[vprime] != crane_tr[v]:
-                    continue
-                if vprime == v:
-                    continue
-                for tprime in G[vprime]:
-                    if (tprime, tstar, vprime, v) in Theta:
-                        est = max(est, S[tprime] + h[tprime] + Delta[(tprime, tstar, vprime, v)])
-                
-                Vprime.add(v)
-                E[v] = est
-
-        vstar = min(Vprime, key=lambda v: E[v])
+            est = conflict_release(est, by_crane[tstar,v], TL, h)
 
+            Vprime.add(v)
+            E[v] = est
 
-        # min_val = min(E[v] for v in Vprime)
-        # vstars = [v for v in Vprime if E[v] == min_val]
-        # if len(vstars) > 1:
-        #     pass
-        # vstar = random.choice(vstars)
-
+        vstar = min(Vprime, key=lambda v: E[v])
+        if rng is not None:
+            min_val = E[vstar]
+            vstars = sorted(v for v in Vprime if E[v] == min_val)
+            vstar = rng.choice(vstars)
 
         S[tstar] = E[vstar]
         G[vstar].add(tstar)
+        insort(TL[vstar], (S[tstar], tstar))
         C[vstar] = E[vstar] + h[tstar]
         L[vstar] = l2[tstar]
         U.remove(tstar)
 
-        for t in W[tstar]:
+        for t, lag in W[tstar]:
             Q[t] -= 1
-            ES[t] = max(ES[t], S[tstar] + g[tstar,t])
+            ES[t] = max(ES[t], S[tstar] + lag)
+            if Q[t] == 0:
+                ready.push(t, ES[t])
 
     obj = sum(S[t] + h[t] - r[t] for t in Tobj)
 
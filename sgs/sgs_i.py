@@ -1,101 +1,85 @@
-import random
+from bisect import insort
 
-def sgs_i(instance):
+from sgs.sgs_ops import ReadyQueue, window_start, NoFeasibleCrane
+
+def sgs_i(instance, rng=None):
+    # rng (random.Random): break ties between equal-ES tasks and equal-E cranes at random
 
     T = instance['T']
     a = instance['a']
     b = instance['b']
-    Xi = instance['Xi']
+    succ = instance['succ']
+    n_pred = instance['n_pred']
     V = instance['V']
     l0 = instance['l^0']
     Vt = instance['V_tau']
     l1 = instance['l^1']
     l2 = instance['l^2']
     that = instance['hat(t)']
-    Theta = instance['Theta']
     h = instance['h']
-    Delta = instance['Delta']
-    g = instance['g']
+    by_crane = instance['conflicts_by_crane']
     Tobj = instance['T^obj']
     r = instance['r']
-    crane_tr = instance['crane_tr']
     ls = instance['ls']
 
     S, ES, W, Q, G, C, L = {}, {}, {}, {}, {}, {}, {}
 
     for t in T:
         ES[t] = a[t]
-        W[t] = set(t2 for t2 in T if (t, t2) in Xi)
-        Q[t] = len(set(t2 for t2 in T if (t2, t) in Xi))
+        W[t] = succ[t]
+        Q[t] = n_pred[t]
     
+    TL = {}  # (S[t], t) per crane, sorted by start time
     for v in V:
         G[v] = set()
+        TL[v] = []
         C[v] = 0
         L[v] = l0[v]
 
     U = set(T)
+    ready = ReadyQueue(ES, [t for t in T if Q[t] == 0])
 
 
 
 
     traj = []
     while U:
-        A = list(t for t in U if Q[t] == 0)
-        A.sort(key=lambda x:(ES[x],x))
-        t1 = A[0]
+        t1 = ready.pop(rng)
 
         Vprime = list()
         E = dict()
 
-        if t1 == 45:
-            pass
-
-
         for v1 in Vt[t1]:
             est = max(ES[t1], C[v1] + abs(l1[t1] - L[v1]) * that)
             if est > ls[t1]:
                 continue
 
-            R = []
-            R.append((est,ls[t1]))
-
-            for v2 in Vt[t1]:
-                if v1 == v2:
-                    continue
-                
-                for t2 in G[v2]:
-                    if (t1,t2,v1,v2) in Theta:
-                        Rprime = []
-
-                        for (es_t1, ls_t1) in R:
-                            new_ls = min(ls_t1, S[t2] - Delta[t1,t2,v1,v2] - h[t1])
-                            if es_t1 <= new_ls:
-                                Rprime.append((es_t1, new_ls))
-                            
-                            new_es = max(es_t1, S[t2] + h[t2] + Delta[t2,t1,v2,v1])
-                            if new_es <= ls_t1:
-                                Rprime.append((new_es, ls_t1))
-                        
-                        R = Rprime
-                
-            if R:
+            e = window_start(est, ls[t1], by_crane[t1,v1], TL, h, t1)
+            if e is not None:
                 Vprime.append(v1)
-                R.sort(key=lambda x:x[0])
-                E[v1] = R[0][0]
+                E[v1] = e
 
+        if not Vprime:
+            raise NoFeasibleCrane(t1)
         Vprime.sort(key=lambda x:(E[x],x))
         vstar = Vprime[0]
+        if rng is not None:
+            vstars = [v for v in Vprime if E[v] == E[vstar]]
+            vstar = rng.choice(vstars)
         tstar = t1
         S[tstar] = E[vstar]
         G[vstar].add(tstar)
+        insort(TL[vstar], (S[tstar], tstar))
         C[vstar] = E[vstar] + h[tstar]
         L[vstar] = l2[tstar]
         U.remove(tstar)
         traj.append((tstar, vstar, S[tstar]))
 
-        for t in W[tstar]:
+        for t, lag in W[tstar]:
             Q[t] -= 1
-            ES[t] = max(ES[t], S[tstar] + g[tstar,t])
+            ES[t] = max(ES[t], S[tstar] + lag)
+            if Q[t] == 0:
+                ready.push(t, ES[t])
 
     obj = sum(S[t] + h[t] - r[t] for t in Tobj)
 
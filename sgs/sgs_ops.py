@@ -1,48 +1,222 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Dict, Any, Set, Tuple
+from typing import Dict, Any, Iterable, List, Optional, Set, Tuple
+from bisect import bisect_right, insort
+import heapq
 import math
 
-@dataclass(frozen=True)
+@dataclass(eq=False)
 class SGSState:
-    S: Dict[int, float]          # start time of scheduled tasks
-    ES: Dict[int, float]         # earliest start time
-    W: Dict[int, Set[int]]       # successors
-    Q: Dict[int, int]            # remaining predecessor count
-    G: Dict[int, Set[int]]       # assigned tasks per crane
-    C: Dict[int, float]          # crane available time
-    L: Dict[int, int]            # crane position
-    U: Set[int]                  # unscheduled tasks
+    """
+    Array-backed SGS state. Task/crane ids index the lists directly.
+    T and W are static and shared by every state derived from the same root;
+    snapshot() copies only the per-step arrays.
+    """
+    S: List[Optional[float]]                  # start time per task (None = unscheduled)
+    ES: List[float]                           # earliest start time per task
+    W: Tuple[Tuple[Tuple[int, float], ...], ...]  # (successor, lag) per task, shared
+    Q: List[int]                              # remaining predecessor count per task
+    G: List[Set[int]]                         # assigned tasks per crane
+    TL: List[List[Tuple[float, int]]]         # (S[t], t) per crane, sorted by start time
+    C: List[float]                            # crane available time
+    L: List[int]                              # crane position
+    U: bytearray                              # 1 if task is unscheduled
+    R: Set[int]                               # ready tasks: unscheduled, all predecessors scheduled
+    n_left: int                               # number of unscheduled tasks
+    T: Tuple[int, ...]                        # task ids (sorted), shared
+    key: int                                  # Zobrist-style XOR hash of (S, G, C, L), kept incrementally
+
+    def snapshot(self) -> "SGSState":
+        return SGSState(
+            S=self.S[:], ES=self.ES[:], W=self.W, Q=self.Q[:],
+            G=[ts.copy() for ts in self.G], TL=[tl[:] for tl in self.TL], C=self.C[:], L=self.L[:],
+            U=self.U[:], R=set(self.R), n_left=self.n_left, T=self.T, key=self.key,
+        )
+
+    def assign(self, other: "SGSState") -> None:
+        """Overwrite this state with other's contents, reusing its buffers."""
+        self.S[:] = other.S
+        self.ES[:] = other.ES
+        self.Q[:] = other.Q
+        for ts, src in zip(self.G, other.G):
+            ts.clear()
+            ts.update(src)
+        for tl, src in zip(self.TL, other.TL):
+            tl[:] = src
+        self.C[:] = other.C
+        self.L[:] = other.L
+        self.U[:] = other.U
+        self.R.clear()
+        self.R.update(other.R)
+        self.n_left = other.n_left
+        self.W = other.W
+        self.T = other.T
+        self.key = other.key
+
+    def same_schedule(self, other: "SGSState") -> bool:
+        """Exact check behind a key match: same starts, assignment and crane states."""
+        return (self.n_left == other.n_left and self.S == other.S and self.G == other.G
+                and self.C == other.C and self.L == other.L)
 
 def build_initial_state(instance: Dict[str, Any]) -> SGSState:
     T = instance["T"]
     es = instance["es"]
-    Xi = instance["Xi"]
     V = instance["V"]
     l0 = instance["l^0"]
 
-    S, ES, W, Q, G, C, L = {}, {}, {}, {}, {}, {}, {}
-
-    Tset = set(T)
+    tasks = tuple(sorted(int(t) for t in T))
+    n = max(tasks) + 1 if tasks else 0
+    m = max(int(v) for v in V) + 1 if V else 0
 
-    for t in T:
-        t = int(t)
+    S: List[Optional[float]] = [None] * n
+    ES = [0.0] * n
+    Q = list(instance["n_pred"])
+    for t in tasks:
         ES[t] = float(es[t])
-        W[t] = set(t2 for t2 in Tset if (t, t2) in Xi)
-        Q[t] = len(set(t2 for t2 in Tset if (t2, t) in Xi))
+    W = instance["succ"]
 
+    G: List[Set[int]] = [set() for _ in range(m)]
+    TL: List[List[Tuple[float, int]]] = [[] for _ in range(m)]
+    C = [0.0] * m
+    L = [0] * m
     for v in V:
         v = int(v)
-        G[v] = set()
-        C[v] = 0.0
         L[v] = int(l0[v])
 
-    U = set(int(t) for t in T)
+    U = bytearray(n)
+    for t in tasks:
+        U[t] = 1
 
-    return SGSState(S=S, ES=ES, W=W, Q=Q, G=G, C=C, L=L, U=U)
+    key = 0
+    for v in V:
+        v = int(v)
+        key ^= hash((v, C[v], L[v]))
+
+    R = {t for t in tasks if Q[t] == 0}
+
+    return SGSState(S=S, ES=ES, W=W, Q=Q, G=G, TL=TL, C=C, L=L, U=U, R=R, n_left=len(tasks), T=tasks, key=key)
 
 def ready_tasks(st: SGSState) -> list[int]:
-    return [t for t in st.U if st.Q[t] == 0]
+    return sorted(st.R)
+
+class ReadyQueue:
+    """
+    Ready tasks ordered by (ES, t), for the min-ES task choice of the SGS
+    kernels. Nothing is deleted from the heap: remove(t), or push(t, es) with a
+    new es, leaves a stale entry that peek()/pop() skip (lazy deletion).
+    """
+    __slots__ = ("_heap", "_live")
+
+    def __init__(self, ES, tasks: Iterable[int] = ()):
+        self._live = {t: ES[t] for t in tasks}  # task -> es of its valid entry
+        self._heap = [(es, t) for t, es in self._live.items()]
+        heapq.heapify(self._heap)
+
+    def push(self, t: int, es: float) -> None:
+        self._live[t] = es
+        heapq.heappush(self._heap, (es, t))
+
+    def remove(self, t: int) -> None:
+        self._live.pop(t, None)
+
+    def peek(self) -> Optional[int]:
+        heap, live = self._heap, self._live
+        while heap:
+            es, t = heap[0]
+            if t in live and live[t] == es:
+                return t
+            heapq.heappop(heap)
+        return None
+
+    def pop(self, rng=None) -> Optional[int]:
+        """Task with the smallest (ES, t); with rng, a random one among those tied on ES."""
+        t = self.peek()
+        if t is None:
+            return None
+        es = self._live.pop(t)
+        heapq.heappop(self._heap)
+        if rng is None:
+            return t
+        ties = [t]
+        while self.peek() is not None and self._heap[0][0] == es:
+            ties.append(heapq.heappop(self._heap)[1])
+            del self._live[ties[-1]]
+        t = ties.pop(rng.randrange(len(ties)))
+        for t2 in ties:
+            self.push(t2, es)
+        return t
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def __contains__(self, t: int) -> bool:
+        return t in self._live
+
+class NoFeasibleCrane(Exception):
+    """Raised by sgs_i when no crane can start a task within its [es, ls] window."""
+
+    def __init__(self, t: int):
+        super().__init__(f"no feasible crane for task {t}")
+        self.t = t
+
+def cut_window(R: List[Tuple[float, float]], lo: float, hi: float) -> List[Tuple[float, float]]:
+    """
+    Remove the open gap (lo, hi) from R, a sorted list of disjoint closed
+    [es, ls] windows. The result is again sorted and disjoint: windows on
+    either side of the gap are kept as they are, and one that straddles it is
+    clipped to [es, lo] and/or [hi, ls]. An empty gap (lo >= hi) removes nothing.
+    """
+    if lo >= hi:
+        return R
+    out = []
+    for es, ls in R:
+        if ls <= lo or es >= hi:
+            out.append((es, ls))
+            continue
+        if es <= lo:
+            out.append((es, lo))
+        if hi <= ls:
+            out.append((hi, ls))
+    return out
+
+def window_start(est: float, ls: float, by_crane, TL, h, t: int) -> Optional[float]:
+    """
+    Earliest start in [est, ls] for t that keeps clear of every scheduled
+    conflicting task, or None if no such start exists. by_crane is
+    instance["conflicts_by_crane"][t, v] and TL the per-crane start-time
+    timelines; scheduled t2 on v2 forbids the starts
+    (S[t2] - Delta_out - h[t], S[t2] + h[t2] + Delta_in), so only the t2 whose
+    start lies within reach of [est, ls] are looked at.
+    """
+    if est > ls:
+        return None
+    R = [(est, ls)]
+    h_t = h[t]
+    for v2, reach_in, reach_out, deltas in by_crane:
+        tl = TL[v2]
+        end = ls + reach_out + h_t
+        for k in range(bisect_right(tl, (est - reach_in, math.inf)), len(tl)):
+            s2, t2 = tl[k]
+            if s2 >= end:
+                break
+            d = deltas.get(t2)
+            if d is None:
+                continue
+            R = cut_window(R, s2 - d[1] - h_t, s2 + h[t2] + d[0])
+            if not R:
+                return None
+    return R[0][0]
+
+def conflict_release(est: float, by_crane, TL, h) -> float:
+    """est pushed past the end (S[t2] + h[t2] + Delta_in) of every scheduled conflicting task."""
+    for v2, reach_in, _, deltas in by_crane:
+        tl = TL[v2]
+        for k in range(bisect_right(tl, (est - reach_in, math.inf)), len(tl)):
+            s2, t2 = tl[k]
+            d = deltas.get(t2)
+            if d is not None and s2 + h[t2] + d[0] > est:
+                est = s2 + h[t2] + d[0]
+    return est
 
 def compute_est(instance: Dict[str, Any], st: SGSState, t: int, v: int) -> float:
     """
@@ -51,78 +225,94 @@ def compute_est(instance: Dict[str, Any], st: SGSState, t: int, v: int) -> float
     """
     l1 = instance["l^1"]
     that = instance["hat(t)"]
-    Theta = instance["Theta"]
     h = instance["h"]
-    Delta = instance["Delta"]
-    Vt = instance["V_tau"][t]
-    crane_tr = instance["crane_tr"]
+    by_crane = instance["conflicts_by_crane"][t, v]
 
     est = max(st.ES[t], st.C[v] + abs(l1[t] - st.L[v]) * that)
 
-    R = []
-    if est <= instance['ls'][t]:
-        R.append((est, instance['ls'][t]))
-        for v2 in Vt:
-            if v2 == v:
-                continue
-            for t2 in st.G[v2]:
-                if (t2, t, v2, v) in Theta:
-                    Rprime = []
-                    for (es_t, ls_t) in R:
-                        new_ls = min(ls_t, st.S[t2] - Delta[(t, t2, v, v2)] - h[t])
-                        if es_t <= new_ls:
-                            Rprime.append((es_t, new_ls))
-                        new_es = max(es_t, st.S[t2] + h[t2] + Delta[((t2, t, v2, v))])
-                        if new_es <= instance['ls'][t]:
-                            Rprime.append((new_es, ls_t))
-                    R = Rprime
-    if R:
-        R.sort(key=lambda x:x[0])
-        return float(R[0][0])
+    e = window_start(est, instance["ls"][t], by_crane, st.TL, h, t)
+    if e is not None:
+        return float(e)
 
     # interference constraints: only compare cranes in same track
-    for vprime in Vt:
-        if vprime == v:
-            continue
-        for tprime in st.G[vprime]:
-            # Your condition: if (tprime, tstar, vprime, v) in Theta
-            key = (tprime, t, vprime, v)
-            if key in Theta:
-                # Delta indexed by (tprime, t, vprime, v)
-                est = max(est, st.S[tprime] + h[tprime] + Delta[key])
-
-    return float(est)
+    return float(conflict_release(est, by_crane, st.TL, h))
 
 def apply_action(instance: Dict[str, Any], st: SGSState, t: int, v: int, est: float) -> SGSState:
     """
     Apply chosen (t,v) with computed est. Mirrors SGS-A updates.
+    Returns a new state; st is left untouched.
     """
-    h = instance["h"]
-    l2 = instance["l^2"]
-    g = instance["g"]
-
-    # copy mutables (simple/debug-friendly; optimize later)
-    S = dict(st.S)
-    ES = dict(st.ES)
-    W = {k: set(vv) for k, vv in st.W.items()}
-    Q = dict(st.Q)
-    G = {k: set(vv) for k, vv in st.G.items()}
-    C = dict(st.C)
-    L = dict(st.L)
-    U = set(st.U)
+    nxt = st.snapshot()
+    apply_action_inplace(instance, nxt, t, v, est)
+    return nxt, est
+
+def apply_action_inplace(instance: Dict[str, Any], st: SGSState, t: int, v: int, est: float,
+                         log: Optional[list] = None) -> float:
+    """
+    Same as apply_action but mutates st. If log is given, the overwritten
+    values are pushed onto it so undo_action() can restore them.
+    """
+    S, ES, Q, W = st.S, st.ES, st.Q, st.W
+
+    if log is not None:
+        # flat frame: old ES of each successor, old C[v], old L[v], old key, v, t
+        for j, _ in W[t]:
+            log.append(ES[j])
+        log.append(st.C[v])
+        log.append(st.L[v])
+        log.append(st.key)
+        log.append(v)
+        log.append(t)
+
+    # key: XOR of hash((t, v, S[t])) per scheduled task and hash((v, C[v], L[v])) per crane
+    key = st.key ^ hash((t, v, est)) ^ hash((v, st.C[v], st.L[v]))
 
     S[t] = est
-    G[v].add(t)
-    C[v] = est + h[t]
-    L[v] = l2[t]
-    U.remove(t)
+    st.G[v].add(t)
+    insort(st.TL[v], (est, t))
+    st.R.discard(t)
+    st.C[v] = est + instance["h"][t]
+    st.L[v] = instance["l^2"][t]
+    st.key = key ^ hash((v, st.C[v], st.L[v]))
+    st.U[t] = 0
+    st.n_left -= 1
 
     # successor updates
-    for j in W[t]:
+    R = st.R
+    for j, lag in W[t]:
         Q[j] -= 1
-        ES[j] = max(ES[j], S[t] + g[(t, j)])
+        if est + lag > ES[j]:
+            ES[j] = est + lag
+        if not Q[j]:
+            R.add(j)
 
-    return SGSState(S=S, ES=ES, W=W, Q=Q, G=G, C=C, L=L, U=U), est
+    return est
+
+def undo_action(st: SGSState, log: list) -> None:
+    """Revert the last apply_action_inplace() recorded on log."""
+    t = log.pop()
+    v = log.pop()
+    st.key = log.pop()
+    st.L[v] = log.pop()
+    st.C[v] = log.pop()
+    ES, Q, R = st.ES, st.Q, st.R
+    for j, _ in reversed(st.W[t]):
+        ES[j] = log.pop()
+        if not Q[j]:
+            R.discard(j)
+        Q[j] += 1
+    tl = st.TL[v]
+    del tl[bisect_right(tl, (st.S[t], t)) - 1]
+    st.S[t] = None
+    st.G[v].remove(t)
+    R.add(t)
+    st.U[t] = 1
+    st.n_left += 1
+
+def rewind(st: SGSState, log: list, mark: int = 0) -> None:
+    """Undo actions until log is back to length mark."""
+    while len(log) > mark:
+        undo_action(st, log)
 
 def compute_obj_delay(instance: Dict[str, Any], st: SGSState) -> tuple[float, float]:
     """
@@ -139,3 +329,55 @@ def compute_obj_delay(instance: Dict[str, Any], st: SGSState) -> tuple[float, fl
     obj = sum(st.S[t] + h[t] - r[t] for t in Tobj)
     delay = sum(max(0.0, st.S[int(t)] - b[int(t)]) for t in T)
     return float(obj), float(delay)
+
+def start_lower_bounds(instance: Dict[str, Any], st: SGSState) -> List[float]:
+    """
+    Lower bound on S[t] in every completion of st built with compute_est:
+    S[t] itself if scheduled, else the max of ES[t], the earliest crane
+    availability min C[v] over V_tau[t] (C never decreases) and lb[i] + lag
+    over unscheduled predecessors i.
+    """
+    V_tau = instance["V_tau"]
+    S, ES, C, W, Q, U = st.S, st.ES, st.C, st.W, st.Q, st.U
+
+    lb = S[:]
+    for t in st.T:
+        if U[t]:
+            c = math.inf
+            for v in V_tau[t]:
+                if C[v] < c:
+                    c = C[v]
+            lb[t] = c if c > ES[t] and c < math.inf else ES[t]
+
+    # Kahn's order over the unscheduled tasks, starting from the ready set
+    q = Q[:]
+    order = list(st.R)
+    k = 0
+    while k < len(order):
+        i = order[k]
+        k += 1
+        for j, lag in W[i]:
+            if not U[j]:
+                continue
+            if lb[i] + lag > lb[j]:
+                lb[j] = lb[i] + lag
+            q[j] -= 1
+            if not q[j]:
+                order.append(j)
+    return lb
+
+def lower_bound_obj_delay(instance: Dict[str, Any], st: SGSState, lb: List[float]) -> tuple[float, float]:
+    """compute_obj_delay with the start times lb = start_lower_bounds(instance, st)."""
+    T = instance["T"]
+    Tobj = instance["T^obj"]
+    h = instance["h"]
+    r = instance["r"]
+    b = instance["b"]
+
+    obj = sum([lb[t] + h[t] - r[t] for t in Tobj])
+    delay = 0.0
+    for t in T:
+        late = lb[t] - b[t]
+        if late > 0:
+            delay += late
+    return float(obj), float(delay)
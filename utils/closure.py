@@ -0,0 +1,69 @@
+import numpy as np
+
+
+class DistMatrix:
+    """
+    Dense longest-path matrix over arbitrary node ids (-inf = no path).
+    Reads like the old dicts: d[i, j] or d[i][j]; iterating yields node ids.
+    """
+
+    def __init__(self, nodes, M):
+        self.nodes = list(nodes)
+        self.idx = {node: k for k, node in enumerate(self.nodes)}
+        self.M = M
+
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            i, j = key
+            return self.M.item(self.idx[i], self.idx[j])
+        return _Row(self, self.idx[key])
+
+    def __setitem__(self, key, value):
+        i, j = key
+        self.M[self.idx[i], self.idx[j]] = value
+
+    def __iter__(self):
+        return iter(self.nodes)
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def add_arc(self, i, j, w):
+        # re-close over a new (or heavier) arc i -> j in O(n^2); exact unless it closes a positive cycle
+        M = self.M
+        a, b = self.idx[i], self.idx[j]
+        np.maximum(M, M[:, a, None] + w + M[None, b, :], out=M)
+
+    def __contains__(self, node):
+        return node in self.idx
+
+
+class _Row:
+    __slots__ = ('_d', '_i')
+
+    def __init__(self, d, i):
+        self._d = d
+        self._i = i
+
+    def __getitem__(self, node):
+        return self._d.M.item(self._i, self._d.idx[node])
+
+    def __setitem__(self, node, value):
+        self._d.M[self._i, self._d.idx[node]] = value
+
+    def __iter__(self):
+        return iter(self._d.nodes)
+
+    def __len__(self):
+        return len(self._d.nodes)
+
+
+def longest_path_closure(M):
+    # (max,+) Floyd-Warshall, in place; -inf entries stay -inf unless a path appears
+    for k in range(M.shape[0]):
+        np.maximum(M, M[:, k, None] + M[None, k, :], out=M)
+    return M
+
+
+def positive_cycle_nodes(d):
+    return [d.nodes[k] for k in np.flatnonzero(np.diagonal(d.M) > 0)]
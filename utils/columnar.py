@@ -0,0 +1,131 @@
+"""
+Columnar instance layout, read by load_instance without any per-key parsing.
+
+An instance <name>.json becomes a directory <name>.cols/ holding
+  meta.json            every field except the ones below, exactly as in the JSON
+  <f>.keys.npy         int64 (m, k): the tuple keys of map field f, one row per entry
+  <f>.vals.npy         int64 or float64 (m,): the matching values
+  <f>.ints.npy         bool (m,), only for maps mixing int and float values:
+                       the entries to read back as int
+  Xi.npy / Theta.npy   int64 (m, 2) / (m, 4): the pairs / quadruples
+for the tuple-keyed maps f in MAP_FILES (g, d, t, t^0, Delta; any may be absent).
+The arrays are memory-mapped on read.
+
+    python -m utils.columnar instance.json [...]
+
+converts JSON files next to themselves. With CFG["derive"] the t^0, t, Theta
+and Delta that load_instance would derive are computed once and stored too.
+"""
+from __future__ import annotations
+
+import ast
+import json
+import os
+import sys
+
+import numpy as np
+
+
+COLUMNAR_EXT = '.cols'
+META_FILE = 'meta.json'
+# instance field -> file stem
+MAP_FILES = {'g': 'g', 'd': 'd', 't': 't', 't^0': 't0', 'Delta': 'Delta'}
+SET_FILES = {'Xi': 'Xi', 'Theta': 'Theta'}
+# tuple length of the keys / elements, so empty fields keep their shape
+ARITY = {'g': 2, 'd': 2, 't': 2, 't^0': 2, 'Delta': 4, 'Xi': 2, 'Theta': 4}
+
+
+def is_columnar(path):
+    return os.path.isdir(path) and os.path.exists(os.path.join(path, META_FILE))
+
+
+def columnar_path(json_path):
+    return os.path.splitext(json_path)[0] + COLUMNAR_EXT
+
+
+def read_columnar(path):
+    """
+    The instance as load_json would return it, except that the MAP_FILES maps
+    are already keyed by int tuples and Xi / Theta are sets of tuples.
+    """
+    with open(os.path.join(path, META_FILE), 'r', encoding='utf-8') as f:
+        instance = json.load(f)
+
+    for field, stem in MAP_FILES.items():
+        kpath = os.path.join(path, f"{stem}.keys.npy")
+        if not os.path.exists(kpath):
+            continue
+        keys = np.load(kpath, mmap_mode='r').reshape(-1, ARITY[field])
+        vals = np.load(os.path.join(path, f"{stem}.vals.npy"), mmap_mode='r').tolist()
+        ipath = os.path.join(path, f"{stem}.ints.npy")
+        if os.path.exists(ipath):
+            ints = np.load(ipath).tolist()
+            vals = [int(x) if i else x for x, i in zip(vals, ints)]
+        cols = [keys[:, i].tolist() for i in range(keys.shape[1])]
+        instance[field] = dict(zip(zip(*cols), vals))
+
+    for field, stem in SET_FILES.items():
+        fpath = os.path.join(path, f"{stem}.npy")
+        if not os.path.exists(fpath):
+            continue
+        arr = np.load(fpath, mmap_mode='r').reshape(-1, ARITY[field])
+        instance[field] = set(zip(*(arr[:, i].tolist() for i in range(arr.shape[1]))))
+
+    return instance
+
+
+def write_columnar(instance, path):
+    """
+    Write instance to the directory path. The MAP_FILES maps may be keyed by
+    tuples or by their JSON strings "(i, j)"; Xi and Theta by any sequences.
+    Values read back with the types they were written with (int or float).
+    """
+    os.makedirs(path, exist_ok=True)
+    meta = {}
+    for field, x in instance.items():
+        if field in MAP_FILES:
+            items = [(ast.literal_eval(k) if isinstance(k, str) else k, v) for k, v in x.items()]
+            stem = MAP_FILES[field]
+            keys = np.array([k for k, _ in items], dtype=np.int64)
+            vals = [v for _, v in items]
+            ints = [isinstance(v, int) for v in vals]
+            dtype = np.int64 if all(ints) else np.float64
+            np.save(os.path.join(path, f"{stem}.keys.npy"), keys.reshape(len(items), ARITY[field]))
+            np.save(os.path.join(path, f"{stem}.vals.npy"), np.array(vals, dtype=dtype))
+            if any(ints) and not all(ints):
+                np.save(os.path.join(path, f"{stem}.ints.npy"), np.array(ints, dtype=bool))
+        elif field in SET_FILES:
+            arr = np.array([tuple(p) for p in sorted(map(tuple, x))], dtype=np.int64)
+            np.save(os.path.join(path, f"{SET_FILES[field]}.npy"), arr.reshape(len(x), ARITY[field]))
+        else:
+            meta[field] = x
+    with open(os.path.join(path, META_FILE), 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+
+
+def convert(json_path, derive=True):
+    """Write json_path as <name>.cols next to it and return that path."""
+    with open(json_path, 'r', encoding='utf-8') as f:
+        instance = json.load(f)
+    if derive:
+        from utils.load_instance import preprocess_instance
+        derived = preprocess_instance(json_path, apply_rules=False)
+        for field in ('h', 't^0', 't', 'Theta', 'Delta'):
+            instance[field] = derived[field]
+    out = columnar_path(json_path)
+    write_columnar(instance, out)
+    return out
+
+
+CFG = {
+    "derive": True,  # also store the derived t^0, t, h, Theta and Delta
+}
+
+
+def main():
+    for f in sys.argv[1:]:
+        print(f"[WROTE] {convert(f, derive=CFG['derive'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Seeded synthetic instances in the JSON schema load_instance reads.
+
+    python -m utils.gen_instance
+
+writes <out_dir>/{n_cranes}_{n_jobs}_{idx}.json for the CFG grid (n_cranes is
+the total over all tracks). h, t^0, t, Theta and Delta are left to
+load_instance to derive, and d (the (n+1)^2 longest-path matrix, only read by
+the rules, which rebuild it) is written only with with_d=True.
+"""
+from __future__ import annotations
+
+import json
+import os
+import random
+
+from utils.load_instance import set_dist_matrix
+
+
+def generate(
+    n_cranes: int,
+    n_jobs: int,
+    seed: int | str = 0,
+    n_tracks: int = 1,
+    prec_density: float = 0.5,   # expected successors per task
+    prec_span: int = 10,         # successors are drawn among the next prec_span tasks by release time
+    tightness: float = 0.0,      # 0: windows of up to 3x the horizon, 1: windows just fit the task
+    interference: float = 1.0,   # share of the yard one move can span; larger = more crane crossings
+    bays_per_crane: int = 10,
+    that: int = 1,
+    lamb: int = 5,
+    with_d: bool = False,
+) -> dict:
+    """
+    n_cranes cranes on each of n_tracks tracks and n_jobs tasks spread over
+    the tracks. Release times are uniform over half the horizon. Precedences
+    go from earlier to later released tasks with lag h[i] (finish-to-start).
+    Start windows are closed backwards over the precedences, so es <= ls and
+    the graph has no positive cycle. Very tight windows can still leave a task
+    without a feasible crane.
+    """
+    rng = random.Random(f"{seed}:{n_cranes}:{n_tracks}:{n_jobs}")
+
+    T = list(range(n_jobs))
+    V = list(range(n_cranes * n_tracks))
+    crane_tr = {v: v // n_cranes for v in V}
+    n_bays = n_cranes * bays_per_crane
+    l0 = {v: int((v % n_cranes + 0.5) * n_bays / n_cranes) for v in V}
+
+    span = max(1, round(interference * (n_bays - 1)))
+    task_tr, l1, l2 = {}, {}, {}
+    for t in T:
+        task_tr[t] = rng.randrange(n_tracks)
+        l1[t] = rng.randrange(n_bays)
+        l2[t] = min(n_bays - 1, max(0, l1[t] + rng.randint(-span, span)))
+    V_tau = {t: [v for v in V if crane_tr[v] == task_tr[t]] for t in T}
+    h = {t: abs(l1[t] - l2[t]) * that + 2 * lamb for t in T}
+
+    horizon = n_jobs * 15
+    a = {t: rng.randrange(horizon // 2) for t in T}
+    order = sorted(T, key=lambda t: (a[t], t))
+
+    # precedences i -> j with j among the next prec_span tasks in release order
+    Xi, g = [], {}
+    p = min(1.0, prec_density / prec_span)
+    for k, i in enumerate(order):
+        for j in order[k + 1:k + 1 + prec_span]:
+            if rng.random() < p:
+                Xi.append([i, j])
+                g[i, j] = h[i]
+    succ = {t: [] for t in T}
+    for i, j in Xi:
+        succ[i].append(j)
+
+    # es: forward pass over the precedences; ls: backward pass so every lag still fits
+    es = dict(a)
+    for i in order:
+        for j in succ[i]:
+            es[j] = max(es[j], es[i] + g[i, j])
+    slack_max = 3 * horizon
+    ls = {}
+    for i in reversed(order):
+        window = max(120, round((1.0 - tightness) * slack_max * rng.uniform(0.5, 1.0)))
+        ls[i] = min([es[i] + window] + [ls[j] - g[i, j] for j in succ[i]])
+
+    b = {t: a[t] + rng.randrange(20, 200) for t in T}
+
+    inst = {
+        'T': T, 'V': V, 'V_tau': V_tau, 'task_tr': task_tr, 'crane_tr': crane_tr,
+        'Xi': Xi, 'g': {str(k): x for k, x in g.items()},
+        'a': a, 'b': b, 'r': dict(a), 'es': es, 'ls': ls,
+        'l^0': l0, 'l^1': l1, 'l^2': l2,
+        'lambda': lamb, 'gamma': 1, 'hat(t)': that,
+        'T^obj': T,
+    }
+    if with_d:
+        tmp = {'T': T, 'es': es, 'ls': ls, 'successors': succ, 'g': g}
+        set_dist_matrix(tmp)
+        d = tmp['d']
+        inst['d'] = {str((i, j)): d[i, j] for i in d for j in d}
+    return inst
+
+
+def write_instance(inst: dict, path: str) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(inst, f)
+
+
+# =========================
+# GENERATOR CONFIG
+# =========================
+CFG = {
+    "out_dir": "./instances",
+
+    "n_cranes_list": [2, 3],   # cranes per track
+    "n_jobs_list": [5, 10, 20, 50, 100, 200],
+    "idx_list": range(30),
+    "n_tracks": 1,
+
+    "seed": 0,
+    "knobs": {
+        "prec_density": 0.5,
+        "prec_span": 10,
+        "tightness": 0.0,
+        "interference": 1.0,
+        "bays_per_crane": 10,
+        "with_d": False,
+    },
+    "overwrite": False,
+}
+# =========================
+
+
+def main():
+    n_tracks = CFG["n_tracks"]
+    for ncr in CFG["n_cranes_list"]:
+        for nj in CFG["n_jobs_list"]:
+            for idx in CFG["idx_list"]:
+                f = os.path.join(CFG["out_dir"], f"{ncr * n_tracks}_{nj}_{idx}.json")
+                if os.path.exists(f) and not CFG["overwrite"]:
+                    print(f"[SKIP] {f}")
+                    continue
+                inst = generate(ncr, nj, seed=f"{CFG['seed']}:{idx}", n_tracks=n_tracks, **CFG["knobs"])
+                write_instance(inst, f)
+                print(f"[WROTE] {f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,13 @@
-import json, os, ast
+import json, os, ast, hashlib, pickle
+from itertools import product
+
+import numpy as np
+
+from utils import closure, columnar
+from utils.closure import DistMatrix, longest_path_closure, positive_cycle_nodes
+from utils.columnar import is_columnar, read_columnar
+
+CACHE_DIRNAME = '.cache'
 
 def load_json(path):
     if not os.path.exists(path):
@@ -6,8 +15,82 @@ def load_json(path):
     with open(path, "r", encoding="utf-8") as f:
         return json.load(f)
 
-def load_instance(path, apply_rules=True):
-    instance = load_json(path)
+def preprocess_version():
+    # any edit to the preprocessing code invalidates cached instances
+    h = hashlib.sha256()
+    for src in (__file__, closure.__file__, columnar.__file__):
+        with open(src, 'rb') as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+_PREPROCESS_VERSION = preprocess_version()
+
+
+def cache_path(path, apply_rules=True):
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Instance not found: {path}")
+    path = os.path.normpath(path)
+    h = hashlib.sha256(_PREPROCESS_VERSION.encode())
+    # a columnar instance is a directory: hash its files in name order
+    files = [os.path.join(path, n) for n in sorted(os.listdir(path))] if os.path.isdir(path) else [path]
+    for src in files:
+        h.update(os.path.basename(src).encode())
+        with open(src, 'rb') as f:
+            h.update(f.read())
+    stem = os.path.splitext(os.path.basename(path))[0]
+    mode = 'rules' if apply_rules else 'raw'
+    return os.path.join(os.path.dirname(path), CACHE_DIRNAME, f"{stem}.{mode}.{h.hexdigest()[:16]}.pkl")
+
+
+def read_cache(cpath):
+    try:
+        with open(cpath, 'rb') as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+
+
+def write_cache(cpath, instance):
+    # write-then-rename so concurrent loaders never see a partial file
+    try:
+        os.makedirs(os.path.dirname(cpath), exist_ok=True)
+        tmp = f"{cpath}.{os.getpid()}.tmp"
+        with open(tmp, 'wb') as f:
+            pickle.dump(instance, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, cpath)
+    except OSError:
+        pass
+
+
+def load_instance(path, apply_rules=True, cache=True):
+    """
+    Load and preprocess an instance. With cache=True the post-rule instance is
+    stored under <instance dir>/.cache, keyed by the file content and the
+    preprocessing code, and reused by later calls.
+    """
+    if cache:
+        cpath = cache_path(path, apply_rules)
+        instance = read_cache(cpath)
+        if instance is not None:
+            print('Instance loaded:', path, '(cached)')
+            return instance
+
+    instance = preprocess_instance(path, apply_rules)
+    if cache:
+        write_cache(cpath, instance)
+
+    print('Instance loaded:', path)
+    return instance
+
+
+def _tuple_keys(m, parsed):
+    # JSON stores tuple keys as "(i, j)" strings; columnar maps come back keyed by tuples
+    return m if parsed else {ast.literal_eval(k): v for k, v in m.items()}
+
+
+def preprocess_instance(path, apply_rules=True):
+    parsed = is_columnar(path)
+    instance = read_columnar(path) if parsed else load_json(path)
 
     if instance['gamma'] != 1:
         raise NotImplementedError("gamma=1 is expected.")
@@ -19,136 +102,70 @@ def load_instance(path, apply_rules=True):
     instance['l^1'] = {int(k):v for k, v in instance['l^1'].items()}
     instance['l^2'] = {int(k):v for k, v in instance['l^2'].items()}
     instance['l^0'] = {int(k):v for k, v in instance['l^0'].items()}
-    instance['g'] = {
-        ast.literal_eval(k): v
-        for k, v in instance['g'].items()
-    }
+    instance['g'] = _tuple_keys(instance['g'], parsed)
     instance['V_tau'] = {int(k):v for k, v in instance['V_tau'].items()}
     instance['crane_tr'] = {int(k):v for k, v in instance['crane_tr'].items()}
     instance['es'] = {int(k):v for k, v in instance['es'].items()}
     instance['ls'] = {int(k):v for k, v in instance['ls'].items()}
-    instance['d'] = {
-        ast.literal_eval(k): v
-        for k, v in instance['d'].items()
-    }
+    if 'd' in instance:
+        # only read by the rules, which rebuild it with set_dist_matrix; optional in the file
+        instance['d'] = _tuple_keys(instance['d'], parsed)
     instance['Xi'] = set(tuple(pair) for pair in instance['Xi'])
 
     if 'h' in instance:
         instance['h'] = {int(k):v for k, v in instance['h'].items()}
     else:
         lamb = instance['lambda']
-        gamma = instance['gamma']
         ls = instance['l^1']
         lt = instance['l^2']
         that = instance['hat(t)']
-        T = instance['T']
-        l0 = instance['l^0']
-        V = instance['V']
-        lmin = {t: min(ls[t], lt[t]) for t in T}
-        lmax = {t: max(ls[t], lt[t]) for t in T}
-        delta = {(v1,v2):(gamma + 1)*abs(v1-v2) for v1 in V for v2 in V}
-        task_tr = instance['task_tr']
-        Vt = instance['V_tau']
-
-        instance['h'] = {t:abs(ls[t]-lt[t])*that+2*lamb for t in T}
+        instance['h'] = {t:abs(ls[t]-lt[t])*that+2*lamb for t in instance['T']}
     
     if 't^0' in instance:
-        instance['t^0'] = {
-            ast.literal_eval(k): v
-            for k, v in instance['t^0'].items()
-        }
+        instance['t^0'] = _tuple_keys(instance['t^0'], parsed)
     else:
-        instance['t^0'] = {
-            (v, t): abs(l0[v]-ls[t])*that
-            for v in V
-            for t in T
-        }
+        instance['t^0'] = crane_travel(instance)
     
     if 't' in instance:
-        instance['t'] = {
-            ast.literal_eval(k): v
-            for k, v in instance['t'].items()
-        }
+        instance['t'] = _tuple_keys(instance['t'], parsed)
     else:
-        instance['t'] = {
-            (t1, t2): abs(lt[t1]-ls[t2])*that
-            for t1 in T
-            for t2 in T
-        }
+        instance['t'] = task_travel(instance)
     
     if 'Theta' in instance:
         instance['Theta'] = set(tuple(quad) for quad in instance['Theta'])
+        quads = theta_index_arrays(instance) if 'Delta' not in instance else None
     else:
-        instance['Theta'] = set(
-            (t1, t2, v1, v2)
-            for t1 in T
-            for t2 in T
-            for v1 in Vt[t1]
-            for v2 in Vt[t2]
-            if task_tr[t1] == task_tr[t2] and v1 != v2 and t1 != t2
-            and ((v1 < v2 and lmax[t1] + delta[(v1,v2)] > lmin[t2])
-                 or (v1 > v2 and lmin[t1] - delta[(v1,v2)] < lmax[t2]))
-        )
+        quads = interference_quads(instance)
+        instance['Theta'] = set(zip(*quad_keys(instance, *quads)))
 
     if 'Delta' in instance:
-        instance['Delta'] = {
-            ast.literal_eval(k): v
-            for k, v in instance['Delta'].items()
-        }
+        instance['Delta'] = _tuple_keys(instance['Delta'], parsed)
     else:
-        instance['Delta'] = {}
-        for t1, t2, v1, v2 in instance['Theta']:
-            if v1 < v2:
-                condition1 = lt[t1] + delta[(v1, v2)] > ls[t2]
-                condition2 = ls[t1] + delta[(v1, v2)] > ls[t2]
-                condition3 = lt[t1] + delta[(v1, v2)] > lt[t2]
-
-                if condition1:
-                    instance['Delta'][(t1, t2, v1, v2)] = (lt[t1] + delta[(v1, v2)] - ls[t2]) * that
-                elif condition2 or condition3:
-                    instance['Delta'][(t1, t2, v1, v2)] = (lt[t1] + delta[(v1, v2)] - ls[t2]) * that - lamb
-                else:
-                    instance['Delta'][(t1, t2, v1, v2)] = (lt[t1] + delta[(v1, v2)] - ls[t2]) * that - 2*lamb
-
-            elif v1 > v2:
-                condition1 = lt[t1] - delta[(v1, v2)] < ls[t2]
-                condition2 = ls[t1] - delta[(v1, v2)] < ls[t2]
-                condition3 = lt[t1] - delta[(v1, v2)] < lt[t2]
-
-                if condition1:
-                    instance['Delta'][(t1, t2, v1, v2)] = (ls[t2] + delta[(v1, v2)] - lt[t1]) * that
-                elif condition2 or condition3:
-                    instance['Delta'][(t1, t2, v1, v2)] = (ls[t2] + delta[(v1, v2)] - lt[t1]) * that - lamb
-                else:
-                    instance['Delta'][(t1, t2, v1, v2)] = (ls[t2] + delta[(v1, v2)] - lt[t1]) * that - 2*lamb
+        instance['Delta'] = interference_delta(instance, *quads)
     
-    instance['successors'] = {t:[succ for (pred,succ) in instance['Xi'] if pred == t] for t in instance['T']}
+    successors = {t:[] for t in instance['T']}
+    for pred, succ in instance['Xi']:
+        successors[pred].append(succ)
+    instance['successors'] = successors
+    set_conflicts(instance)
 
     if apply_rules:
+        # full closures once; the rules keep d and prec_dist closed via add_arc
         set_prec_dist(instance)
-        rule_1_added = rule_1(instance)
         set_dist_matrix(instance)
+
+        rule_1_added = rule_1(instance)
+        check_pos_cycle(instance)
         set_start_window(instance)
-        set_prec_dist(instance)
 
         rule_2_added = rule_2(instance)
-        set_dist_matrix(instance)
+        check_pos_cycle(instance)
         set_start_window(instance)
-        set_prec_dist(instance)
 
         rule_3_added = rule_3(instance)
 
-    pass
-
-
+    set_adjacency(instance)
 
-
-
-
-
-
-
-    print('Instance loaded:', path)
     return instance
 
 
@@ -158,6 +175,7 @@ def rule_1(inst):
     es = inst['es']
     ls = inst['ls']
     prec_dist = inst['prec_dist']
+    dist = inst['d']
     task_tr = inst['task_tr']
     h = inst['h']
     travel = inst['t']
@@ -205,6 +223,8 @@ def rule_1(inst):
                 g[t1,t2] = lag
             if (t1,t2) not in Xi:
                 Xi.add((t1,t2))
+            prec_dist.add_arc(t1, t2, 1)
+            dist.add_arc(t1, t2, g[t1,t2])
     
     return num_added
 
@@ -215,6 +235,7 @@ def rule_2(inst):
     ls = inst['ls']
     h = inst['h']
     prec_dist = inst['prec_dist']
+    dist = inst['d']
     task_tr = inst['task_tr']
     Theta = inst['Theta']
     Delta = inst['Delta']
@@ -328,6 +349,8 @@ def rule_2(inst):
                 g[t1,t2] = lag
             if (t1,t2) not in Xi:
                 Xi.add((t1,t2))
+            prec_dist.add_arc(t1, t2, 1)
+            dist.add_arc(t1, t2, g[t1,t2])
     
     return num_added
 
@@ -337,6 +360,7 @@ def rule_3(inst):
     es = inst['es']
     ls = inst['ls']
     prec_dist = inst['prec_dist']
+    dist = inst['d']
     task_tr = inst['task_tr']
     successors = inst['successors']
     g = inst['g']
@@ -424,11 +448,8 @@ def rule_3(inst):
         
         possible_mat[t_pred].append(t_succ)
 
-        prec_dist[t_pred][t_succ] = 1
-        for t1 in tasks:
-            for t2 in tasks:
-                if prec_dist[t1][t2] < prec_dist[t1][t_pred] + prec_dist[t_pred][t_succ] + prec_dist[t_succ][t2]:
-                    prec_dist[t1][t2] = prec_dist[t1][t_pred] + prec_dist[t_pred][t_succ] + prec_dist[t_succ][t2]
+        prec_dist.add_arc(t_pred, t_succ, 1)
+        dist.add_arc(t_pred, t_succ, lag)
 
     return num_added
 
@@ -471,6 +492,163 @@ def set_start_window(inst):
         inst['es'][t] = max(inst['es'][t], inst['d'][-1,t])
         inst['ls'][t] = min(inst['ls'][t], -inst['d'][t,-1])
 
+def _task_array(inst, key):
+    return np.array([inst[key][t] for t in inst['T']])
+
+
+def crane_travel(inst):
+    # t^0[v, t] = |l^0[v] - l^1[t]| * hat(t)
+    V = inst['V']
+    l0 = np.array([inst['l^0'][v] for v in V])
+    l1 = _task_array(inst, 'l^1')
+    tt = np.abs(l0[:,None] - l1[None,:]) * inst['hat(t)']
+    return dict(zip(product(V, inst['T']), tt.ravel().tolist()))
+
+
+def task_travel(inst):
+    # t[t1, t2] = |l^2[t1] - l^1[t2]| * hat(t)
+    T = inst['T']
+    l1 = _task_array(inst, 'l^1')
+    l2 = _task_array(inst, 'l^2')
+    tt = np.abs(l2[:,None] - l1[None,:]) * inst['hat(t)']
+    return dict(zip(product(T, T), tt.ravel().tolist()))
+
+
+def interference_quads(inst):
+    # index arrays (i1, i2, v1, v2) of every (t1, t2, v1, v2) in Theta, tasks as positions in T
+    T = inst['T']
+    V = inst['V']
+    Vt = inst['V_tau']
+    gamma = inst['gamma']
+    l1 = _task_array(inst, 'l^1')
+    l2 = _task_array(inst, 'l^2')
+    task_tr = _task_array(inst, 'task_tr')
+    lmin = np.minimum(l1, l2)
+    lmax = np.maximum(l1, l2)
+
+    n = len(T)
+    same_tr = (task_tr[:,None] == task_tr[None,:]) & ~np.eye(n, dtype=bool)
+    on_crane = {v: np.array([v in Vt[t] for t in T], dtype=bool) for v in V}
+
+    parts = []
+    for v1 in V:
+        for v2 in V:
+            if v1 == v2:
+                continue
+            mask = same_tr & on_crane[v1][:,None] & on_crane[v2][None,:]
+            delta = (gamma + 1)*abs(v1-v2)
+            if v1 < v2:
+                mask &= lmax[:,None] + delta > lmin[None,:]
+            else:
+                mask &= lmin[:,None] - delta < lmax[None,:]
+            i1, i2 = np.nonzero(mask)
+            parts.append((i1, i2, np.full(len(i1), v1), np.full(len(i1), v2)))
+
+    if not parts:
+        return tuple(np.zeros(0, dtype=int) for _ in range(4))
+    return tuple(np.concatenate(col) for col in zip(*parts))
+
+
+def theta_index_arrays(inst):
+    # same layout as interference_quads, for a Theta given in the file
+    if not inst['Theta']:
+        return tuple(np.zeros(0, dtype=int) for _ in range(4))
+    pos = {t: i for i, t in enumerate(inst['T'])}
+    quads = np.array(list(inst['Theta']))
+    i1 = np.array([pos[t] for t in quads[:,0].tolist()])
+    i2 = np.array([pos[t] for t in quads[:,1].tolist()])
+    return i1, i2, quads[:,2], quads[:,3]
+
+
+def quad_keys(inst, i1, i2, v1, v2):
+    T = np.array(inst['T'])
+    return T[i1].tolist(), T[i2].tolist(), v1.tolist(), v2.tolist()
+
+
+def interference_delta(inst, i1, i2, v1, v2):
+    lamb = inst['lambda']
+    gamma = inst['gamma']
+    that = inst['hat(t)']
+    ls = _task_array(inst, 'l^1')
+    lt = _task_array(inst, 'l^2')
+
+    delta = (gamma + 1)*np.abs(v1-v2)
+    ls1, lt1, ls2, lt2 = ls[i1], lt[i1], ls[i2], lt[i2]
+
+    up = v1 < v2
+    down = v1 > v2
+    base = np.where(up, (lt1 + delta - ls2) * that, (ls2 + delta - lt1) * that)
+    c1 = np.where(up, lt1 + delta > ls2, lt1 - delta < ls2)
+    c23 = np.where(up,
+                   (ls1 + delta > ls2) | (lt1 + delta > lt2),
+                   (ls1 - delta < ls2) | (lt1 - delta < lt2))
+
+    valid = up | down
+    lowered = base - lamb
+    if lowered.dtype == base.dtype:
+        vals = np.where(c1, base, np.where(c23, lowered, base - 2*lamb))
+        keys = zip(*quad_keys(inst, i1[valid], i2[valid], v1[valid], v2[valid]))
+        return dict(zip(keys, vals[valid].tolist()))
+
+    # int geometry with a float lambda: split so each value keeps the type the scalar formula gives it
+    Delta = {}
+    for mask, sub in ((c1, None), (~c1 & c23, lamb), (~c1 & ~c23, 2*lamb)):
+        mask = mask & valid
+        vals = base[mask] if sub is None else base[mask] - sub
+        keys = zip(*quad_keys(inst, i1[mask], i2[mask], v1[mask], v2[mask]))
+        Delta.update(zip(keys, vals.tolist()))
+    return Delta
+
+
+def set_adjacency(inst):
+    # final precedence graph (after the rules), rows indexed by task id and shared by every SGS run:
+    #   succ[t] = ((t2, g[t, t2]), ...) sorted by t2,  n_pred[t] = number of predecessors of t
+    tasks = inst['T']
+    g = inst['g']
+
+    n = max(tasks) + 1 if tasks else 0
+    succ = [[] for _ in range(n)]
+    n_pred = [0] * n
+    for t1, t2 in inst['Xi']:
+        succ[t1].append((t2, g[t1,t2]))
+        n_pred[t2] += 1
+
+    inst['succ'] = tuple(tuple(sorted(row)) for row in succ)
+    inst['n_pred'] = tuple(n_pred)
+
+
+def set_conflicts(inst):
+    # conflicts[t, v] = ((t2, v2, Delta_in, Delta_out), ...) for every (t2, t, v2, v) in Theta
+    #   t on v after t2 on v2 : start(t) >= S[t2] + h[t2] + Delta_in
+    #   t on v before t2 on v2: S[t] + h[t] + Delta_out <= S[t2]
+    Theta = inst['Theta']
+    Delta = inst['Delta']
+
+    conflicts = {}
+    for t in inst['T']:
+        for v in inst['V_tau'][t]:
+            conflicts[t,v] = []
+    for t2, t, v2, v in Theta:
+        conflicts.setdefault((t,v), []).append((t2, v2, Delta[t2,t,v2,v], Delta.get((t,t2,v,v2))))
+
+    inst['conflicts'] = {k: tuple(sorted(c)) for k, c in conflicts.items()}
+
+    # same pairs grouped by the other crane, for bisecting its start-time timeline:
+    #   conflicts_by_crane[t, v] = ((v2, reach_in, reach_out, {t2: (Delta_in, Delta_out)}), ...)
+    #   reach_in = max h[t2] + Delta_in, reach_out = max Delta_out over those t2
+    h = inst['h']
+    by_crane = {}
+    for (t, v), c in inst['conflicts'].items():
+        per_v2 = {}
+        for t2, v2, d_in, d_out in c:
+            per_v2.setdefault(v2, {})[t2] = (d_in, d_out)
+        by_crane[t,v] = tuple(
+            (v2, max(h[t2] + d[0] for t2, d in deltas.items()), max(d[1] for d in deltas.values()), deltas)
+            for v2, deltas in sorted(per_v2.items())
+        )
+    inst['conflicts_by_crane'] = by_crane
+
+
 import sys
 def set_dist_matrix(inst):
     tasks = inst['T']
@@ -479,68 +657,43 @@ def set_dist_matrix(inst):
     succ_list = inst['successors']
     g = inst['g']
 
-    dist = {}
+    n = len(tasks)
+    dist = DistMatrix(tasks+[-1], np.full((n+1, n+1), float('-inf')))
+    M = dist.M
+    np.fill_diagonal(M, 0)
 
-    for t in tasks+[-1]:
-        for t in tasks+[-1]:
-            dist[t,t] = {}
-
-    dist[-1,-1] = 0
     for t in tasks:
         dist[-1,t] = es[t]
         dist[t,-1] = -ls[t]
+        for t2 in succ_list[t]:
+            if t2 != t:
+                dist[t,t2] = g[t,t2]
+
+    longest_path_closure(M)
 
-    for t1 in tasks:
-        for t2 in tasks:
-            if t1 == t2:
-                dist[t1,t2] = 0
-            else:
-                if t2 in succ_list[t1]:
-                    dist[t1,t2] = g[t1, t2]
-                else:
-                    dist[t1,t2] = float('-inf')
-    for t in tasks+[-1]:
-        for k in tasks+[-1]:
-            for l in tasks+[-1]:
-                if t != k and t != l:
-                    if dist[k,t] + dist[t,l] > dist[k,l]:
-                        dist[k,l] = dist[k,t] + dist[t,l]
-
-    for t in tasks+[-1]:
-        if dist[t,t] > 0:
-            sys.exit(f'Pos Cycle exists: {t}')
-    
     inst['d'] = dist
-    pass
+    check_pos_cycle(inst)
+
+
+def check_pos_cycle(inst):
+    pos = positive_cycle_nodes(inst['d'])
+    if pos:
+        sys.exit(f'Pos Cycle exists: {pos[0]}')
 
 
 def set_prec_dist(inst):
     tasks = inst['T']
-    Xi = inst['Xi']
     succ_list = inst['successors']
 
-    dist = {}
+    n = len(tasks)
+    dist = DistMatrix(tasks, np.full((n, n), float('-inf')))
+    np.fill_diagonal(dist.M, 0)
 
     for t in tasks:
-        dist[t] = {}
-    
-    for t1 in tasks:
-        for t2 in tasks:
-            if t1 == t2:
-                dist[t1][t2] = 0
-            else:
-                if t2 in succ_list[t1]:
-                    dist[t1][t2] = 1
-                else:
-                    dist[t1][t2] = float('-inf')
+        for t2 in succ_list[t]:
+            if t2 != t:
+                dist[t,t2] = 1
+
+    longest_path_closure(dist.M)
 
-    for t in tasks:
-        for k in tasks:
-            for l in tasks:
-                if t != k and t != l:
-                    if dist[k][t] + dist[t][l] > dist[k][l]:
-                        dist[k][l] = dist[k][t] + dist[t][l]
-    
     inst['prec_dist'] = dist
-    
-    pass
\ No newline at end of file
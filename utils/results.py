@@ -0,0 +1,155 @@
+"""
+Results store: one SQLite file (WAL mode, so it can be queried while a sweep
+writes to it), one row per (file, seed, config hash). The full result row is
+kept as JSON next to a few indexed columns used for resume and aggregation.
+
+The config hash covers only the settings that differ from their defaults, so
+adding a new option (with a default that keeps the old behavior) leaves the
+hashes of existing results, and resume, intact.
+
+    python -m utils.results results.sqlite   # mean imp_ratio / wall_sec by size, per config
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import sys
+import time
+
+# job fields that identify the instance / seed rather than the configuration
+INSTANCE_FIELDS = ("inst_file", "file", "n_cranes", "n_jobs", "idx", "seed")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    file        TEXT NOT NULL,
+    seed        INTEGER NOT NULL,
+    config_hash TEXT NOT NULL,
+    n_cranes    INTEGER,
+    n_jobs      INTEGER,
+    ok          INTEGER,
+    imp_ratio   REAL,
+    wall_sec    REAL,
+    config      TEXT NOT NULL,
+    row         TEXT NOT NULL,
+    PRIMARY KEY (file, seed, config_hash)
+);
+CREATE INDEX IF NOT EXISTS results_size ON results (n_cranes, n_jobs);
+"""
+
+
+def job_config(job: dict, defaults: dict | None = None) -> dict:
+    """The configuration part of job, without the settings equal to defaults."""
+    defaults = defaults or {}
+    return {
+        k: v for k, v in job.items()
+        if k not in INSTANCE_FIELDS and not (k in defaults and defaults[k] == v)
+    }
+
+
+def config_hash(config: dict) -> str:
+    blob = json.dumps(config, sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode()).hexdigest()[:16]
+
+
+class ResultsStore:
+    """
+    Buffered writer: add() queues a row and the queue is committed in one
+    transaction every batch_size rows or flush_sec seconds, and on close().
+    A row with an existing (file, seed, config hash) replaces it.
+    """
+
+    def __init__(self, path: str, batch_size: int = 50, flush_sec: float = 10.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_sec = flush_sec
+        self._pending: list = []
+        self._last_flush = time.monotonic()
+
+        self.conn = sqlite3.connect(path, timeout=60)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def done_keys(self) -> set:
+        return set(self.conn.execute("SELECT file, seed, config_hash FROM results"))
+
+    def add(self, row: dict, config: dict) -> None:
+        self._pending.append((
+            row["file"], row["seed"], config_hash(config), row.get("n_cranes"), row.get("n_jobs"),
+            int(bool(row.get("ok"))), row.get("imp_ratio"), row.get("wall_sec"),
+            json.dumps(config, sort_keys=True, default=str), json.dumps(row, default=str),
+        ))
+        if len(self._pending) >= self.batch_size or time.monotonic() - self._last_flush >= self.flush_sec:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._pending:
+            with self.conn:
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", self._pending
+                )
+            self._pending = []
+        self._last_flush = time.monotonic()
+
+    def close(self) -> None:
+        self.flush()
+        self.conn.close()
+
+    def __enter__(self) -> "ResultsStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def aggregate(path: str, by=("config_hash", "n_cranes", "n_jobs"), config: str | None = None) -> list:
+    """
+    Per-group count, ok count, mean / min / max imp_ratio and mean / max
+    wall_sec, optionally restricted to one config hash. Groups are per config
+    by default; leave config_hash out of by only to pool runs on purpose.
+    """
+    cols = ", ".join(by)
+    where, args = ("WHERE config_hash = ?", (config,)) if config else ("", ())
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    try:
+        rows = conn.execute(
+            f"SELECT {cols}, COUNT(*) AS n, SUM(ok) AS n_ok, "
+            f"AVG(imp_ratio) AS imp_mean, MIN(imp_ratio) AS imp_min, MAX(imp_ratio) AS imp_max, "
+            f"AVG(wall_sec) AS wall_mean, MAX(wall_sec) AS wall_max "
+            f"FROM results {where} GROUP BY {cols} ORDER BY {cols}",
+            args,
+        ).fetchall()
+    finally:
+        conn.close()
+    return [dict(r) for r in rows]
+
+
+def configs(path: str) -> dict:
+    """config hash -> config dict, for every config in the store."""
+    conn = sqlite3.connect(path)
+    try:
+        rows = conn.execute("SELECT DISTINCT config_hash, config FROM results ORDER BY config_hash").fetchall()
+    finally:
+        conn.close()
+    return {h: json.loads(c) for h, c in rows}
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else "results.sqlite"
+    rows = aggregate(path)
+    for h, config in configs(path).items():
+        print(f"[{h}] {json.dumps(config, sort_keys=True)}")
+        for r in rows:
+            if r["config_hash"] != h:
+                continue
+            print(
+                f"  {r['n_cranes']}x{r['n_jobs']}: n={r['n']} ok={r['n_ok']} "
+                f"imp={r['imp_mean']:.4f} [{r['imp_min']:.4f}, {r['imp_max']:.4f}] "
+                f"wall={r['wall_mean']:.2f}s (max {r['wall_max']:.2f}s)"
+            )
+
+
+if __name__ == "__main__":
+    main()